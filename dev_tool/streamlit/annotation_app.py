@@ -15,7 +15,7 @@ from pathlib import Path
 # Import our modules
 from video_processor import VideoProcessor
 from annotation_manager import AnnotationManager
-from ui_components import VideoPlayer, AnnotationControls, BoundingBoxTool
+from ui_components import VideoPlayer, AnnotationControls, BoundingBoxTool, SURFER_COLORS
 
 # Page configuration
 st.set_page_config(
@@ -268,12 +268,14 @@ def display_video_player():
     if not st.session_state.video_loaded:
         return
     
-    # Get current frame
-    frame = st.session_state.video_processor.get_frame_at_time(st.session_state.current_time)
+    # Get current frame, downscaled to the display width
+    processor = st.session_state.video_processor
+    frame = processor.get_preview_frame_at_time(st.session_state.current_time)
     
     if frame is not None:
-        # Draw annotations on frame
-        annotated_frame = draw_annotations_on_frame(frame)
+        # Draw annotations on frame (boxes are stored in native resolution)
+        scale = frame.shape[1] / processor.width if processor.width else 1.0
+        annotated_frame = draw_annotations_on_frame(frame, scale)
         
         # Display frame with modern parameter
         st.image(annotated_frame, channels="BGR", use_container_width=True)
@@ -334,28 +336,26 @@ def display_video_player():
     else:
         st.error("❌ Unable to load video frame. Please check the video file.")
 
-def draw_annotations_on_frame(frame):
-    """Draw current annotations on the frame"""
+def draw_annotations_on_frame(frame, scale=1.0):
+    """Draw current annotations on the frame, scaling boxes by scale"""
     annotated_frame = frame.copy()
     
-    # Get active surfers at current time
-    active_surfers = st.session_state.annotation_manager.get_active_surfers(st.session_state.current_time)
+    # Get boxes of active surfers at current time
+    ids, bboxes = st.session_state.annotation_manager.get_active_bboxes(st.session_state.current_time)
+    if scale != 1.0:
+        bboxes = (bboxes * scale).astype(np.int32)
     
-    for surfer in active_surfers:
-        if surfer.get('bbox'):
-            x, y, w, h = surfer['bbox']
-            
-            # Choose color based on surfer ID
-            colors = [(0, 255, 0), (255, 0, 0), (0, 0, 255), (255, 255, 0), (255, 0, 255)]
-            color = colors[surfer['id'] % len(colors)]
-            
-            # Draw bounding box
-            cv2.rectangle(annotated_frame, (x, y), (x + w, y + h), color, 2)
-            
-            # Draw surfer label
-            label = f"Surfer {surfer['id']}"
-            cv2.putText(annotated_frame, label, (x, y - 10), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+    for surfer_id, (x, y, w, h) in zip(ids.tolist(), bboxes.tolist()):
+        # Choose color based on surfer ID
+        color = SURFER_COLORS[surfer_id % len(SURFER_COLORS)]
+        
+        # Draw bounding box
+        cv2.rectangle(annotated_frame, (x, y), (x + w, y + h), color, 2)
+        
+        # Draw surfer label
+        label = f"Surfer {surfer_id}"
+        cv2.putText(annotated_frame, label, (x, y - 10), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
     
     return annotated_frame
 
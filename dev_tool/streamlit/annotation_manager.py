@@ -10,6 +10,80 @@ from typing import List, Dict, Optional, Any
 from datetime import datetime
 import copy
 
+import numpy as np
+
+
+def _is_valid_bbox(bbox) -> bool:
+    """Check for a [x, y, width, height] list of non-negative numbers with positive size"""
+    if not isinstance(bbox, list) or len(bbox) != 4:
+        return False
+    
+    x, y, width, height = bbox
+    return all(isinstance(val, (int, float)) and val >= 0 for val in bbox) and width > 0 and height > 0
+
+
+class AnnotationStore:
+    """
+    Column-oriented snapshot of surfer ids, times and bounding boxes
+    
+    Missing times are stored as NaN and missing boxes as zero rows with
+    has_bbox False, so per-frame queries run as NumPy masks instead of
+    walking the surfer dictionaries.
+    """
+    
+    def __init__(self, surfers: List[Dict]):
+        count = len(surfers)
+        self.ids = np.fromiter((s['id'] for s in surfers), dtype=np.int32, count=count)
+        self.start_times = np.array(
+            [np.nan if s.get('start_time') is None else s['start_time'] for s in surfers],
+            dtype=np.float64)
+        self.end_times = np.array(
+            [np.nan if s.get('end_time') is None else s['end_time'] for s in surfers],
+            dtype=np.float64)
+        self.bboxes = np.zeros((count, 4), dtype=np.int32)
+        self.has_bbox = np.zeros(count, dtype=bool)
+        
+        # Boxes are only checked to be non-negative, so clamp coordinates
+        # into int32 range rather than overflow on oversized values
+        # Loaded data is not box-checked, so skip malformed boxes here
+        boxed = [i for i, surfer in enumerate(surfers) if _is_valid_bbox(surfer.get('bbox'))]
+        if boxed:
+            coords = np.array([surfers[i]['bbox'] for i in boxed], dtype=np.float64)
+            limits = np.iinfo(np.int32)
+            self.bboxes[boxed] = np.clip(coords, limits.min, limits.max)
+            self.has_bbox[boxed] = True
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def active_mask(self, timestamp: float) -> np.ndarray:
+        """
+        Get mask of surfers active at timestamp
+        
+        Args:
+            timestamp: Time in seconds
+            
+        Returns:
+            numpy.ndarray: Boolean mask, one entry per surfer
+        """
+        # NaN start never matches; NaN end (ongoing ride) never excludes
+        return (self.start_times <= timestamp) & ~(self.end_times < timestamp)
+    
+    def valid_bbox_mask(self, frame_width: int, frame_height: int) -> np.ndarray:
+        """
+        Get mask of surfers whose bounding box fits inside the frame
+        
+        Args:
+            frame_width: Frame width
+            frame_height: Frame height
+            
+        Returns:
+            numpy.ndarray: Boolean mask, one entry per surfer
+        """
+        x, y, width, height = self.bboxes.astype(np.int64).T
+        return (self.has_bbox & (width > 0) & (height > 0) & (x >= 0) & (y >= 0)
+                & (x + width <= frame_width) & (y + height <= frame_height))
+
 
 class AnnotationManager:
     """Manages surfer annotations and session data"""
@@ -22,6 +96,7 @@ class AnnotationManager:
         self.next_surfer_id = 1
         self.session_created = None
         self.session_modified = None
+        self._store = None  # AnnotationStore built on demand from surfers
     
     def initialize_session(self, video_file: str, duration: float, fps: float):
         """
@@ -39,6 +114,7 @@ class AnnotationManager:
         self.next_surfer_id = 1
         self.session_created = datetime.now().isoformat()
         self.session_modified = self.session_created
+        self._store = None
     
     def add_surfer(self, start_time: Optional[float] = None) -> int:
         """
@@ -200,24 +276,33 @@ class AnnotationManager:
         Returns:
             list: List of active surfer dictionaries
         """
-        active_surfers = []
+        active = np.flatnonzero(self.get_store().active_mask(timestamp))
+        return [copy.deepcopy(self.surfers[i]) for i in active.tolist()]
+    
+    def get_active_bboxes(self, timestamp: float):
+        """
+        Get ids and bounding boxes of surfers active at timestamp
         
-        for surfer in self.surfers:
-            start_time = surfer.get('start_time')
-            end_time = surfer.get('end_time')
+        Args:
+            timestamp: Time in seconds
             
-            # Check if surfer is active at timestamp
-            if start_time is not None:
-                if end_time is not None:
-                    # Both start and end times defined
-                    if start_time <= timestamp <= end_time:
-                        active_surfers.append(copy.deepcopy(surfer))
-                else:
-                    # Only start time defined
-                    if timestamp >= start_time:
-                        active_surfers.append(copy.deepcopy(surfer))
-        
-        return active_surfers
+        Returns:
+            tuple: (int32 ids of shape (N,), int32 boxes of shape (N, 4))
+        """
+        store = self.get_store()
+        mask = store.active_mask(timestamp) & store.has_bbox
+        return store.ids[mask], store.bboxes[mask]
+    
+    def get_store(self) -> AnnotationStore:
+        """
+        Get column-oriented view of the current surfers
+        
+        Returns:
+            AnnotationStore: Snapshot rebuilt after any modification
+        """
+        if self._store is None:
+            self._store = AnnotationStore(self.surfers)
+        return self._store
     
     def get_annotation_data(self) -> Dict[str, Any]:
         """
@@ -401,14 +486,12 @@ class AnnotationManager:
     def _update_modified_time(self):
         """Update session modified timestamp"""
         self.session_modified = datetime.now().isoformat()
+        # Every modification passes through here, so drop the stale snapshot
+        self._store = None
     
     def _validate_bbox(self, bbox: List[int]) -> bool:
         """Validate bounding box format"""
-        if not isinstance(bbox, list) or len(bbox) != 4:
-            return False
-        
-        x, y, width, height = bbox
-        return all(isinstance(val, (int, float)) and val >= 0 for val in bbox) and width > 0 and height > 0
+        return _is_valid_bbox(bbox)
     
     def _validate_annotation_data(self, data: Dict[str, Any]) -> bool:
         """Validate annotation data structure"""
@@ -7,33 +7,27 @@ Run this script to start the annotation application
 import sys
 import os
 import subprocess
-from pathlib import Path
+from importlib.util import find_spec
+
+REQUIRED_PACKAGES = ("streamlit", "cv2", "numpy", "pandas")
+STARTUP_DIRECTORIES = ("data", "output", "annotations", "temp")
 
 def check_requirements():
     """Check if required packages are installed"""
-    try:
-        import streamlit
-        import cv2
-        import numpy
-        import pandas
-        print("✓ All required packages are installed")
-        return True
-    except ImportError as e:
-        print(f"✗ Missing required package: {e}")
+    # find_spec only probes the import system, so the heavy packages are not
+    # initialised here; streamlit imports them itself when the app starts
+    missing = [name for name in REQUIRED_PACKAGES if find_spec(name) is None]
+    if missing:
+        print(f"✗ Missing required package(s): {', '.join(missing)}")
         print("Please install requirements with: pip install -r requirements.txt")
         return False
+    print("✓ All required packages are installed")
+    return True
 
 def setup_directories():
     """Create necessary directories"""
-    directories = [
-        "data",
-        "output",
-        "annotations",
-        "temp"
-    ]
-    
-    for directory in directories:
-        Path(directory).mkdir(exist_ok=True)
+    for directory in STARTUP_DIRECTORIES:
+        os.makedirs(directory, exist_ok=True)
         print(f"✓ Directory '{directory}' ready")
 
 def run_application():
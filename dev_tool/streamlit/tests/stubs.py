@@ -0,0 +1,42 @@
+"""
+Lightweight test doubles for UI component tests
+Plain attribute access instead of Mock's dynamic attribute machinery
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+
+@dataclass
+class PlayerStub:
+    """Video player double that records the calls made on it"""
+    is_playing: bool = False
+    current_frame: int = 0
+    fps: float = 30.0
+    calls: List[Tuple] = field(default_factory=list)
+    
+    def play(self):
+        self.calls.append(("play",))
+    
+    def pause(self):
+        self.calls.append(("pause",))
+    
+    def stop(self):
+        self.calls.append(("stop",))
+    
+    def seek(self, timestamp):
+        self.calls.append(("seek", timestamp))
+    
+    def seek_to_frame(self, frame_number):
+        self.calls.append(("seek_to_frame", frame_number))
+    
+    def called(self, name):
+        """Return True if the named method was called at least once"""
+        return any(call[0] == name for call in self.calls)
+    
+    def last_call(self, name):
+        """Return the most recent call to the named method, or None"""
+        for call in reversed(self.calls):
+            if call[0] == name:
+                return call
+        return None
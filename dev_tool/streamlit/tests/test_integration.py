@@ -6,6 +6,7 @@ Tests for video processing, annotation management, and UI component integration
 import pytest
 import time
 import cv2
+import numpy as np
 import tempfile
 import os
 from unittest.mock import Mock, patch, mock_open
@@ -17,7 +18,7 @@ import sys
 sys.path.append('..')
 from video_processor import VideoProcessor
 from annotation_manager import AnnotationManager
-from ui_components import VideoPlayer, AnnotationControls, BoundingBoxTool
+from ui_components import VideoPlayer, AnnotationControls, BoundingBoxTool, TimelineVisualization
 
 
 class AnnotationSession:
@@ -96,6 +97,75 @@ class TestVideoPlayerIntegration:
         expected_position = int((current_time / video_duration) * timeline_width)
         mock_timeline.update_position.assert_called_with(expected_position)
     
+    def test_timeline_background_cached_between_cursor_moves(self):
+        """Test that only the cursor is redrawn while the annotations are unchanged"""
+        timeline = TimelineVisualization()
+        surfers = [{"id": 1, "start_time": 10.0, "end_time": 25.0}]
+        
+        with patch.object(timeline, '_draw_timeline_background',
+                          wraps=timeline._draw_timeline_background) as mock_draw:
+            first = timeline.create_timeline_image(120.0, surfers, 30.0)
+            second = timeline.create_timeline_image(120.0, surfers, 60.0)
+            assert mock_draw.call_count == 1
+            assert not np.array_equal(first, second)
+            
+            # Marking an end time invalidates the cached background
+            surfers[0]["end_time"] = 40.0
+            timeline.create_timeline_image(120.0, surfers, 60.0)
+            assert mock_draw.call_count == 2
+    
+    def test_timeline_position_conversions_clamp(self):
+        """Test marker and click conversions at and beyond the timeline ends"""
+        player = VideoPlayer()
+        timeline = TimelineVisualization()
+        
+        assert player.create_timeline_marker(-5.0, 120.0) == 0
+        assert player.create_timeline_marker(60.0, 120.0) == 400
+        assert player.create_timeline_marker(500.0, 120.0) == 800
+        assert player.create_timeline_marker(10.0, 0.0) == 0
+        
+        assert timeline.timeline_click_to_time(-10, 800, 120.0) == 0.0
+        assert timeline.timeline_click_to_time(400, 800, 120.0) == 60.0
+        assert timeline.timeline_click_to_time(900, 800, 120.0) == 120.0
+    
+    def test_timeline_reused_while_cursor_stays_on_same_pixel(self):
+        """Test that sub-pixel time changes return the previous image"""
+        timeline = TimelineVisualization()
+        surfers = [{"id": 1, "start_time": 10.0, "end_time": 25.0}]
+        
+        first = timeline.create_timeline_image(120.0, surfers, 30.0)
+        assert timeline.create_timeline_image(120.0, surfers, 30.1) is first
+        assert timeline.create_timeline_image(120.0, surfers, 31.0) is not first
+        
+        # invalidate() forces a full redraw
+        timeline.invalidate()
+        with patch.object(timeline, '_draw_timeline_background',
+                          wraps=timeline._draw_timeline_background) as mock_draw:
+            timeline.create_timeline_image(120.0, surfers, 31.0)
+            assert mock_draw.call_count == 1
+    
+    def test_timeline_cursor_matches_line_drawing(self):
+        """Test that the cursor fill covers the same pixels as a 2px cv2.line"""
+        timeline = TimelineVisualization()
+        surfers = [{"id": 2, "start_time": 5.0, "end_time": 50.0}]
+        
+        for current_time in [0.0, 0.1, 33.3, 119.9, 120.0]:
+            image = timeline.create_timeline_image(120.0, surfers, current_time)
+            expected = timeline._bg_cache.copy()
+            x = int((current_time / 120.0) * 800)
+            cv2.line(expected, (x, 0), (x, expected.shape[0]), (0, 255, 255), 2)
+            assert np.array_equal(image, expected)
+    
+    def test_timeline_tick_marks_every_ten_seconds(self):
+        """Test that tick marks land at their scaled x positions"""
+        timeline = TimelineVisualization()
+        
+        image = timeline.create_timeline_image(60.0, [], 0.0, width=600)
+        
+        # Below the labels, ticks are the only non-background pixels
+        row = image[40, :, 0]
+        assert np.flatnonzero(row == 100).tolist() == [100, 200, 300, 400, 500]
+    
     def test_bounding_box_drawing_on_video_frames(self):
         """Test drawing bounding boxes on video frames"""
         mock_canvas = Mock()
@@ -113,6 +183,47 @@ class TestVideoPlayerIntegration:
             outline="red", width=2
         )
     
+    def test_video_player_copies_frame_at_most_once(self):
+        """Test that displaying a frame never modifies the decoded frame"""
+        player = VideoPlayer()
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        annotations = [{"id": 1, "bbox": [100, 150, 200, 300]}]
+        
+        with patch('ui_components.st') as mock_st:
+            mock_image = mock_st.image
+            
+            # No annotations: the decoded frame is displayed as-is
+            player.display_frame(frame)
+            assert mock_image.call_args[0][0] is frame
+            
+            # With annotations: drawn on a copy, the source stays untouched
+            player.display_frame(frame, annotations)
+            displayed = mock_image.call_args[0][0]
+            assert displayed is not frame
+            assert displayed.any()
+            assert not frame.any()
+            
+            # The annotated display buffer is reused across frames
+            player.display_frame(frame, annotations)
+            assert mock_image.call_args[0][0] is displayed
+        
+        # In-place drawing reuses the caller's buffer
+        assert player.draw_annotations(frame, annotations, inplace=True) is frame
+    
+    def test_bbox_tool_draws_in_place_on_request(self):
+        """Test that draw_bbox_on_frame only copies when the caller needs it"""
+        tool = BoundingBoxTool()
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        bbox = [100, 150, 200, 300]
+        
+        copied = tool.draw_bbox_on_frame(frame, bbox)
+        assert copied is not frame
+        assert copied.any() and not frame.any()
+        
+        drawn = tool.draw_bbox_on_frame(frame, bbox, inplace=True)
+        assert drawn is frame
+        assert np.array_equal(frame, copied)
+    
     def test_multi_surfer_annotation_workflow(self):
         """Test complete multi-surfer annotation workflow"""
         mock_annotation_state = Mock()
@@ -308,6 +419,51 @@ class TestDataFlowIntegration:
         assert session.video_file == "session_001.mp4"
         assert len(session.surfers) == 1
         assert session.surfers[0]["start_time"] == 10.2
+    
+    def test_annotation_store_matches_surfer_dicts(self):
+        """Test that the column store answers active-surfer queries like the dicts"""
+        manager = AnnotationManager()
+        manager.initialize_session("test.mp4", 120.0, 30.0)
+        
+        first = manager.add_surfer(10.0)
+        manager.set_surfer_end_time(first, 25.0)
+        manager.set_surfer_bbox(first, [100, 150, 200, 300])
+        second = manager.add_surfer(20.0)  # Still riding, no box
+        manager.add_surfer()  # Not started
+        
+        assert [s['id'] for s in manager.get_active_surfers(5.0)] == []
+        assert [s['id'] for s in manager.get_active_surfers(22.0)] == [first, second]
+        assert [s['id'] for s in manager.get_active_surfers(25.0)] == [first, second]
+        assert [s['id'] for s in manager.get_active_surfers(60.0)] == [second]
+        
+        ids, bboxes = manager.get_active_bboxes(22.0)
+        assert ids.tolist() == [first]
+        assert bboxes.dtype == np.int32
+        assert bboxes.tolist() == [[100, 150, 200, 300]]
+        
+        store = manager.get_store()
+        assert store.valid_bbox_mask(640, 480).tolist() == [True, False, False]
+        assert store.valid_bbox_mask(250, 480).tolist() == [False, False, False]
+        
+        # Coordinates past int16 range (accepted by set_surfer_bbox) still work
+        assert manager.set_surfer_bbox(second, [40000, 10, 50, 50])
+        assert [s['id'] for s in manager.get_active_surfers(22.0)] == [first, second]
+        assert manager.get_active_bboxes(22.0)[1].tolist() == [[100, 150, 200, 300],
+                                                               [40000, 10, 50, 50]]
+        store = manager.get_store()
+        
+        # Malformed boxes from loaded files are treated as no box
+        data = manager.get_annotation_data()
+        data['surfers'][0]['bbox'] = [1, 2, 3]
+        assert manager.load_annotation_data(data)
+        assert [s['id'] for s in manager.get_active_surfers(22.0)] == [first, second]
+        assert manager.get_active_bboxes(22.0)[0].tolist() == [second]
+        store = manager.get_store()
+        
+        # Modifications rebuild the store
+        manager.delete_surfer(first)
+        assert manager.get_store() is not store
+        assert manager.get_active_bboxes(22.0)[0].tolist() == [second]
 
 
 class TestPerformanceIntegration:
@@ -3,10 +3,25 @@ Unit Tests - UI Component Functions
 Tests for button handlers, timeline scrubbing, and keyboard shortcuts
 """
 
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 import tkinter as tk
 
+from .stubs import PlayerStub
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
 
 class TestButtonHandlers:
     """Test button click handlers"""
@@ -14,30 +29,28 @@ class TestButtonHandlers:
     def test_play_pause_button_handler(self):
         """Test play/pause button functionality"""
         # Mock video player state
-        mock_player = Mock()
-        mock_player.is_playing = False
+        mock_player = PlayerStub(is_playing=False)
         
         # Test play action
         result = handle_play_pause_click(mock_player)
         
         assert result == "playing"
-        assert mock_player.play.called
+        assert mock_player.called("play")
     
     def test_stop_button_handler(self):
         """Test stop button functionality"""
-        mock_player = Mock()
-        mock_player.is_playing = True
+        mock_player = PlayerStub(is_playing=True)
         
         result = handle_stop_click(mock_player)
         
         assert result == "stopped"
-        assert mock_player.stop.called
-        assert mock_player.seek.called_with(0)
+        assert mock_player.called("stop")
+        assert ("seek", 0) in mock_player.calls
     
     def test_add_surfer_button_handler(self):
         """Test add surfer button functionality"""
         mock_annotation_state = Mock()
-        mock_annotation_state.surfers = []
+        mock_annotation_state.surfers = SurferTable()
         mock_annotation_state.current_time = 10.5
         
         result = handle_add_surfer_click(mock_annotation_state)
@@ -51,15 +64,34 @@ class TestButtonHandlers:
         mock_annotation_state = Mock()
         mock_annotation_state.current_surfer_id = 1
         mock_annotation_state.current_time = 25.8
-        mock_annotation_state.surfers = [
-            {"id": 1, "start_time": 10.2, "end_time": None}
-        ]
+        mock_annotation_state.surfers = SurferTable()
+        mock_annotation_state.surfers.append(10.2)
         
         result = handle_mark_end_click(mock_annotation_state)
         
         assert mock_annotation_state.surfers[0]["end_time"] == 25.8
         assert result == "end_marked"
     
+    def test_surfer_table_growth_and_active_query(self):
+        """Test that the surfer table grows and answers timeline queries"""
+        table = SurferTable(capacity=2)
+        for start_time in (10.0, 20.0, 30.0, 40.0, 50.0):
+            table.append(start_time, bbox=[100, 150, 200, 300])
+        table.set_end_time(1, 15.0)
+        table.set_end_time(2, 35.0)
+        
+        assert len(table) == 5
+        assert table[0]["bbox"] == [100, 150, 200, 300]
+        assert table[-1]["end_time"] is None
+        assert table.set_end_time(99, 60.0) is False
+        
+        # Surfer 1 has ended, surfer 2 is still riding, 3 is open-ended
+        assert table.active_at(32.0).tolist() == [2, 3]
+        
+        # Coordinates past int16 range are stored as-is
+        surfer_id = table.append(60.0, bbox=[40000, 10, 50, 50])
+        assert table[table.index_of(surfer_id)]["bbox"] == [40000, 10, 50, 50]
+    
     def test_save_annotations_button_handler(self):
         """Test save annotations button functionality"""
         mock_annotation_state = Mock()
@@ -83,7 +115,7 @@ class TestTimelineScrubbing:
         
         expected_time = 60.0  # Middle of video
         
-        calculated_time = timeline_click_to_time(click_position, timeline_width, video_duration)
+        calculated_time = timeline_click_to_time(click_position, TimelineScale(timeline_width, video_duration))
         
         assert abs(calculated_time - expected_time) < 0.1
     
@@ -95,14 +127,22 @@ class TestTimelineScrubbing:
         
         expected_position = 200  # Quarter of timeline width
         
-        calculated_position = time_to_timeline_position(timestamp, timeline_width, video_duration)
+        calculated_position = time_to_timeline_position(timestamp, TimelineScale(timeline_width, video_duration))
         
         assert abs(calculated_position - expected_position) < 1
     
+    def test_timeline_scale_with_zero_duration(self):
+        """Test that a video reporting no duration maps every position to 0"""
+        scale = TimelineScale(800, 0.0)
+        
+        assert timeline_click_to_time(-10, scale) == 0.0
+        assert timeline_click_to_time(400, scale) == 0.0
+        assert time_to_timeline_position(5.0, scale) == 0
+        assert TimelineScale(0, 120.0).sec_per_px == 0.0
+    
     def test_timeline_drag_handler(self):
         """Test timeline dragging functionality"""
-        mock_player = Mock()
-        mock_timeline = Mock()
+        mock_player = PlayerStub()
         
         # Simulate drag event
         drag_event = Mock()
@@ -111,22 +151,51 @@ class TestTimelineScrubbing:
         timeline_width = 600
         video_duration = 90.0
         
-        handle_timeline_drag(drag_event, mock_player, timeline_width, video_duration)
+        handle_timeline_drag(drag_event, mock_player, TimelineScale(timeline_width, video_duration),
+                             SeekThrottle())
         
         expected_time = 45.0  # 300/600 * 90
-        mock_player.seek.assert_called_with(expected_time)
+        assert mock_player.last_call("seek") == ("seek", expected_time)
+    
+    def test_timeline_drag_seeks_are_throttled(self):
+        """Test that rapid drag events collapse into fewer seeks"""
+        mock_player = PlayerStub()
+        other_player = PlayerStub()
+        scale = TimelineScale(600, 90.0)
+        throttle = SeekThrottle()
+        widget = Mock()
+        
+        for x in (100, 200, 300, 400, 500):
+            drag_event = Mock(x=x, widget=widget)
+            handle_timeline_drag(drag_event, mock_player, scale, throttle)
+        
+        # Leading seek only; one trailing flush is scheduled on the widget
+        assert mock_player.calls == [("seek", 15.0)]  # 100/600 * 90
+        widget.after.assert_called_once()
+        
+        # A drag on another timeline has its own throttle state
+        handle_timeline_drag(Mock(x=300, widget=Mock()), other_player, scale, SeekThrottle())
+        assert other_player.calls == [("seek", 45.0)]
+        
+        # Run the scheduled trailing flush as the Tk event loop would
+        _, callback, *args = widget.after.call_args[0]
+        callback(*args)
+        
+        assert mock_player.calls == [("seek", 15.0), ("seek", 75.0)]  # 500/600 * 90
+        assert not throttle.flush_scheduled
     
     def test_timeline_boundary_handling(self):
         """Test timeline click boundary handling"""
         timeline_width = 800
         video_duration = 120.0
+        scale = TimelineScale(timeline_width, video_duration)
         
         # Test click before timeline start
-        time_before = timeline_click_to_time(-10, timeline_width, video_duration)
+        time_before = timeline_click_to_time(-10, scale)
         assert time_before == 0.0
         
         # Test click after timeline end
-        time_after = timeline_click_to_time(900, timeline_width, video_duration)
+        time_after = timeline_click_to_time(900, scale)
         assert time_after == video_duration
 
 
@@ -135,8 +204,7 @@ class TestKeyboardShortcuts:
     
     def test_spacebar_play_pause_shortcut(self):
         """Test spacebar for play/pause"""
-        mock_player = Mock()
-        mock_player.is_playing = False
+        mock_player = PlayerStub(is_playing=False)
         
         # Simulate spacebar press
         key_event = Mock()
@@ -145,13 +213,11 @@ class TestKeyboardShortcuts:
         result = handle_keyboard_shortcut(key_event, mock_player)
         
         assert result == "play_pause_triggered"
-        assert mock_player.play.called
+        assert mock_player.called("play")
     
     def test_arrow_keys_frame_navigation(self):
         """Test arrow keys for frame-by-frame navigation"""
-        mock_player = Mock()
-        mock_player.current_frame = 1000
-        mock_player.fps = 30.0
+        mock_player = PlayerStub(current_frame=1000, fps=30.0)
         
         # Test right arrow (next frame)
         key_event = Mock()
@@ -159,13 +225,13 @@ class TestKeyboardShortcuts:
         
         handle_keyboard_shortcut(key_event, mock_player)
         expected_frame = 1001
-        mock_player.seek_to_frame.assert_called_with(expected_frame)
+        assert mock_player.last_call("seek_to_frame") == ("seek_to_frame", expected_frame)
         
         # Test left arrow (previous frame)
         key_event.keysym = "Left"
         handle_keyboard_shortcut(key_event, mock_player)
         expected_frame = 999
-        mock_player.seek_to_frame.assert_called_with(expected_frame)
+        assert mock_player.last_call("seek_to_frame") == ("seek_to_frame", expected_frame)
     
     def test_number_keys_surfer_selection(self):
         """Test number keys for surfer selection"""
@@ -203,7 +269,7 @@ class TestKeyboardShortcuts:
         key_event = Mock()
         key_event.keysym = "invalid_key"
         
-        result = handle_keyboard_shortcut(key_event, Mock())
+        result = handle_keyboard_shortcut(key_event, PlayerStub())
         
         assert result == "no_action"
 
@@ -243,6 +309,29 @@ class TestBoundingBoxUI:
         # Verify rectangle was drawn/updated
         canvas.create_rectangle.assert_called()
     
+    def test_bounding_box_redraws_are_coalesced(self):
+        """Test that a burst of drag events moves the rectangle only once"""
+        canvas = Mock()
+        start_event = Mock()
+        start_event.x = 100
+        start_event.y = 150
+        bbox_state = start_bbox_drawing(canvas, start_event)
+        
+        for x, y in [(120, 170), (150, 200), (200, 250)]:
+            mouse_event = Mock()
+            mouse_event.x = x
+            mouse_event.y = y
+            update_bbox_drawing(canvas, mouse_event, bbox_state)
+        
+        # One rectangle, one scheduled flush
+        canvas.create_rectangle.assert_called_once()
+        canvas.after_idle.assert_called_once()
+        canvas.delete.assert_not_called()
+        
+        flush_bbox_drawing(canvas, bbox_state)
+        canvas.coords.assert_called_once_with(bbox_state["rect_id"], 100, 150, 200, 250)
+        assert bbox_state["flush_scheduled"] is False
+    
     def test_finish_bounding_box_drawing(self):
         """Test finishing bounding box drawing"""
         canvas = Mock()
@@ -261,6 +350,42 @@ class TestBoundingBoxUI:
         expected_bbox = [100, 150, 100, 100]  # [x, y, width, height]
         assert result == expected_bbox
         assert bbox_state["drawing"] is False
+    
+    def test_release_before_idle_flush_keeps_final_rectangle(self):
+        """Test that the rectangle lands on the release point when the flush has not run"""
+        canvas = Mock()
+        start_event = Mock(x=100, y=150)
+        bbox_state = start_bbox_drawing(canvas, start_event)
+        
+        # Motion and release arrive in the same event batch
+        update_bbox_drawing(canvas, Mock(x=200, y=250), bbox_state)
+        result = finish_bbox_drawing(canvas, Mock(x=200, y=250), bbox_state)
+        
+        assert result == [100, 150, 100, 100]
+        canvas.coords.assert_called_once_with(bbox_state["rect_id"], 100, 150, 200, 250)
+        assert bbox_state["pending"] is None
+        
+        # The idle flush that was already scheduled is now a no-op
+        callback, *args = canvas.after_idle.call_args[0]
+        callback(*args)
+        canvas.coords.assert_called_once()
+    
+    def test_finish_bounding_box_drawn_backwards(self):
+        """Test that dragging up and left still yields a normalized box"""
+        canvas = Mock()
+        bbox_state = {
+            "start_x": 200,
+            "start_y": 250,
+            "drawing": True
+        }
+        
+        mouse_event = Mock()
+        mouse_event.x = 100
+        mouse_event.y = 150
+        
+        result = finish_bbox_drawing(canvas, mouse_event, bbox_state)
+        
+        assert result == [100, 150, 100, 100]
 
 
 # Mock functions to be implemented in actual annotation tool
@@ -281,24 +406,98 @@ def handle_stop_click(player):
     return "stopped"
 
 
+INT32_RANGE = (np.iinfo(np.int32).min, np.iinfo(np.int32).max)
+
+
+class SurferTable:
+    """Surfer annotations stored column-wise, one NumPy array per field
+    
+    Surfer ids are assigned sequentially, so the id column stays sorted and
+    lookups use np.searchsorted. Missing end times are stored as NaN and
+    missing bounding boxes as all zeros.
+    """
+    
+    def __init__(self, capacity=16):
+        self.n = 0
+        self.ids = np.empty(capacity, dtype=np.int32)
+        self.start_times = np.empty(capacity, dtype=np.float64)
+        self.end_times = np.empty(capacity, dtype=np.float64)
+        self.bboxes = np.empty((capacity, 4), dtype=np.int32)
+    
+    def __len__(self):
+        return self.n
+    
+    def __getitem__(self, index):
+        """Return row `index` as a surfer dictionary"""
+        if not -self.n <= index < self.n:
+            raise IndexError("surfer index out of range")
+        index %= self.n
+        end_time = self.end_times[index]
+        bbox = self.bboxes[index]
+        return {
+            "id": int(self.ids[index]),
+            "start_time": float(self.start_times[index]),
+            "end_time": None if np.isnan(end_time) else float(end_time),
+            "bbox": bbox.tolist() if bbox.any() else None
+        }
+    
+    def append(self, start_time, bbox=None):
+        """Add a surfer and return its id"""
+        if self.n == len(self.ids):
+            self._grow()
+        
+        n = self.n
+        surfer_id = n + 1
+        self.ids[n] = surfer_id
+        self.start_times[n] = start_time
+        self.end_times[n] = np.nan
+        # Clamp like AnnotationStore instead of overflowing on huge coordinates
+        self.bboxes[n] = np.clip(np.asarray(bbox, dtype=np.float64), *INT32_RANGE) if bbox else 0
+        self.n += 1
+        return surfer_id
+    
+    def index_of(self, surfer_id):
+        """Return the row index for surfer_id, or None"""
+        index = int(np.searchsorted(self.ids[:self.n], surfer_id))
+        if index < self.n and self.ids[index] == surfer_id:
+            return index
+        return None
+    
+    def set_end_time(self, surfer_id, end_time):
+        """Set end time for a surfer; returns False if the id is unknown"""
+        index = self.index_of(surfer_id)
+        if index is None:
+            return False
+        self.end_times[index] = end_time
+        return True
+    
+    def active_at(self, timestamp):
+        """Return ids of surfers whose ride covers timestamp (open rides included)"""
+        end_times = self.end_times[:self.n]
+        mask = (self.start_times[:self.n] <= timestamp) & (
+            (end_times >= timestamp) | np.isnan(end_times))
+        return self.ids[:self.n][mask]
+    
+    def _grow(self):
+        """Double the capacity of every column"""
+        capacity = 2 * max(len(self.ids), 1)
+        for name in ("ids", "start_times", "end_times", "bboxes"):
+            column = getattr(self, name)
+            grown = np.empty((capacity,) + column.shape[1:], dtype=column.dtype)
+            grown[:self.n] = column[:self.n]
+            setattr(self, name, grown)
+
+
 def handle_add_surfer_click(annotation_state):
     """Handle add surfer button click"""
-    new_surfer = {
-        "id": len(annotation_state.surfers) + 1,
-        "start_time": annotation_state.current_time,
-        "end_time": None,
-        "bbox": None
-    }
-    annotation_state.surfers.append(new_surfer)
-    return new_surfer
+    surfer_id = annotation_state.surfers.append(annotation_state.current_time)
+    return annotation_state.surfers[surfer_id - 1]
 
 
 def handle_mark_end_click(annotation_state):
     """Handle mark ride end button click"""
-    for surfer in annotation_state.surfers:
-        if surfer["id"] == annotation_state.current_surfer_id:
-            surfer["end_time"] = annotation_state.current_time
-            break
+    annotation_state.surfers.set_end_time(annotation_state.current_surfer_id,
+                                          annotation_state.current_time)
     return "end_marked"
 
 
@@ -307,107 +506,192 @@ def handle_save_click(annotation_state):
     try:
         data = annotation_state.get_annotation_data()
         return export_annotations_to_json(data, "annotations.json")
-    except Exception as e:
-        print(f"Error in save handler: {e}")
+    except Exception:
+        logger.exception("Error in save handler")
         return False
 
 
-def timeline_click_to_time(click_x, timeline_width, video_duration):
-    """Convert timeline click position to timestamp"""
-    # Handle boundary conditions
-    if click_x < 0:
-        return 0.0
-    if click_x > timeline_width:
-        return video_duration
+@dataclass
+class TimelineScale:
+    """Timeline geometry with pixel/second factors precomputed once per video"""
+    width: int
+    duration: float
+    sec_per_px: float = field(init=False)
+    px_per_sec: float = field(init=False)
     
-    ratio = click_x / timeline_width
-    return ratio * video_duration
+    def __post_init__(self):
+        # Videos without FPS metadata load with duration 0.0
+        if self.width <= 0 or self.duration <= 0:
+            self.sec_per_px = 0.0
+            self.px_per_sec = 0.0
+        else:
+            self.sec_per_px = self.duration / self.width
+            self.px_per_sec = self.width / self.duration
+
 
+def timeline_click_to_time(click_x, scale):
+    """Convert timeline click position to timestamp, clamped to the video"""
+    return max(0.0, min(scale.duration, click_x * scale.sec_per_px))
 
-def time_to_timeline_position(timestamp, timeline_width, video_duration):
+
+def time_to_timeline_position(timestamp, scale):
     """Convert timestamp to timeline position"""
-    ratio = timestamp / video_duration
-    return int(ratio * timeline_width)
+    return int(timestamp * scale.px_per_sec)
 
 
-def handle_timeline_drag(event, player, timeline_width, video_duration):
-    """Handle timeline dragging"""
-    timestamp = timeline_click_to_time(event.x, timeline_width, video_duration)
-    player.seek(timestamp)
+# Minimum time between seeks issued while dragging the timeline (~30 Hz)
+SEEK_INTERVAL = 0.033
 
+@dataclass
+class SeekThrottle:
+    """Drag-seek throttling state, one per player timeline"""
+    last_seek: float = float("-inf")
+    pending: Optional[float] = None
+    flush_scheduled: bool = False
 
-def handle_keyboard_shortcut(event, player=None, annotation_state=None):
-    """Handle keyboard shortcuts"""
-    key = event.keysym.lower()
+
+def handle_timeline_drag(event, player, scale, throttle):
+    """Handle timeline dragging (seeks are throttled, the last position always lands)"""
+    throttle.pending = timeline_click_to_time(event.x, scale)
     
-    # Play/pause with spacebar
-    if key == "space" and player:
+    if time.monotonic() - throttle.last_seek >= SEEK_INTERVAL:
+        flush_pending_seek(player, throttle)
+    elif not throttle.flush_scheduled:
+        # Trailing seek on the Tk event loop, never from a worker thread
+        throttle.flush_scheduled = True
+        event.widget.after(int(SEEK_INTERVAL * 1000), flush_pending_seek, player, throttle)
+
+
+def flush_pending_seek(player, throttle):
+    """Seek the player to the most recent drag position, if any"""
+    throttle.flush_scheduled = False
+    timestamp, throttle.pending = throttle.pending, None
+    if timestamp is None:
+        return
+    throttle.last_seek = time.monotonic()
+    player.seek(timestamp)
+
+
+def _shortcut_play_pause(event, player, annotation_state):
+    """Play/pause with spacebar"""
+    if player:
         handle_play_pause_click(player)
         return "play_pause_triggered"
-    
-    # Frame navigation with arrow keys
-    elif key == "right" and player:
-        next_frame = player.current_frame + 1
-        player.seek_to_frame(next_frame)
+    return None
+
+
+def _shortcut_frame_forward(event, player, annotation_state):
+    """Next frame with right arrow"""
+    if player:
+        player.seek_to_frame(player.current_frame + 1)
         return "frame_forward"
-    
-    elif key == "left" and player:
-        prev_frame = player.current_frame - 1
-        player.seek_to_frame(prev_frame)
+    return None
+
+
+def _shortcut_frame_backward(event, player, annotation_state):
+    """Previous frame with left arrow"""
+    if player:
+        player.seek_to_frame(player.current_frame - 1)
         return "frame_backward"
+    return None
+
+
+def _shortcut_save(event, player, annotation_state):
+    """Save with Ctrl+S"""
+    if getattr(event, 'state', None) == 4:
+        handle_save_click(annotation_state)
+        return "save_triggered"
+    return None
+
+
+# Lower-cased keysym -> shortcut handler; handlers return None when not applicable
+KEYBOARD_SHORTCUTS = {
+    "space": _shortcut_play_pause,
+    "right": _shortcut_frame_forward,
+    "left": _shortcut_frame_backward,
+    "s": _shortcut_save,
+}
+
+
+# Digit keysym -> surfer id
+DIGIT_KEYS = {str(i): i for i in range(10)}
+
+
+def handle_keyboard_shortcut(event, player=None, annotation_state=None):
+    """Handle keyboard shortcuts"""
+    key = event.keysym.lower()
     
     # Surfer selection with number keys
-    elif key.isdigit() and annotation_state:
-        surfer_id = int(key)
-        if surfer_id <= len(annotation_state.surfers):
+    surfer_id = DIGIT_KEYS.get(key)
+    if surfer_id is not None:
+        if annotation_state and surfer_id <= len(annotation_state.surfers):
             annotation_state.current_surfer_id = surfer_id
             return "surfer_selected"
+        return "no_action"
     
-    # Save with Ctrl+S
-    elif key == "s" and hasattr(event, 'state') and event.state == 4:
-        handle_save_click(annotation_state)
-        return "save_triggered"
-    
-    return "no_action"
+    handler = KEYBOARD_SHORTCUTS.get(key)
+    result = handler(event, player, annotation_state) if handler else None
+    return result or "no_action"
 
 
 def start_bbox_drawing(canvas, event):
     """Start bounding box drawing"""
+    rect_id = canvas.create_rectangle(
+        event.x, event.y, event.x, event.y,
+        outline="red", width=2
+    )
     return {
         "start_x": event.x,
         "start_y": event.y,
         "drawing": True,
-        "rect_id": None
+        "rect_id": rect_id,
+        "pending": None,
+        "flush_scheduled": False
     }
 
 
 def update_bbox_drawing(canvas, event, bbox_state):
-    """Update bounding box while drawing"""
+    """Update bounding box while drawing (redraws are coalesced to one per idle)"""
     if bbox_state["drawing"]:
-        # Remove previous rectangle if exists
-        if bbox_state["rect_id"]:
-            canvas.delete(bbox_state["rect_id"])
-        
-        # Draw new rectangle
-        rect_id = canvas.create_rectangle(
-            bbox_state["start_x"], bbox_state["start_y"],
-            event.x, event.y,
-            outline="red", width=2
-        )
-        bbox_state["rect_id"] = rect_id
+        # Create the rectangle once; later updates only move its corners
+        if not bbox_state.get("rect_id"):
+            bbox_state["rect_id"] = canvas.create_rectangle(
+                bbox_state["start_x"], bbox_state["start_y"],
+                event.x, event.y,
+                outline="red", width=2
+            )
+        
+        bbox_state["pending"] = (event.x, event.y)
+        if not bbox_state.get("flush_scheduled"):
+            bbox_state["flush_scheduled"] = True
+            canvas.after_idle(flush_bbox_drawing, canvas, bbox_state)
+
+
+def flush_bbox_drawing(canvas, bbox_state):
+    """Apply the latest pending drag position to the bounding box rectangle"""
+    bbox_state["flush_scheduled"] = False
+    pending = bbox_state.get("pending")
+    if bbox_state["drawing"] and pending is not None:
+        canvas.coords(bbox_state["rect_id"],
+                      bbox_state["start_x"], bbox_state["start_y"], *pending)
+        bbox_state["pending"] = None
 
 
 def finish_bbox_drawing(canvas, event, bbox_state):
     """Finish bounding box drawing and return coordinates"""
     if bbox_state["drawing"]:
         x1, y1 = bbox_state["start_x"], bbox_state["start_y"]
-        x2, y2 = event.x, event.y
+        dx, dy = event.x - x1, event.y - y1
         
         # Normalize coordinates (top-left, width, height)
-        x = min(x1, x2)
-        y = min(y1, y2)
-        width = abs(x2 - x1)
-        height = abs(y2 - y1)
+        x, width = (x1, dx) if dx >= 0 else (event.x, -dx)
+        y, height = (y1, dy) if dy >= 0 else (event.y, -dy)
+        
+        # The release can arrive before the idle flush: place the rectangle
+        # at the release point now, since the flush skips finished drawings
+        if bbox_state.get("rect_id"):
+            canvas.coords(bbox_state["rect_id"], x1, y1, event.x, event.y)
+        bbox_state["pending"] = None
         
         bbox_state["drawing"] = False
         return [x, y, width, height]
@@ -419,10 +703,17 @@ def finish_bbox_drawing(canvas, event, bbox_state):
 def export_annotations_to_json(annotation_data, output_path):
     """Export annotation data to JSON file"""
     try:
-        import json
-        with open(output_path, 'w') as f:
-            json.dump(annotation_data, f, indent=2)
+        # Serialize the whole payload up front and write it in one call
+        if orjson is not None:
+            payload = orjson.dumps(
+                annotation_data,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            )
+        else:
+            payload = json.dumps(annotation_data, separators=(",", ":")).encode()
+        with open(output_path, 'wb') as f:
+            f.write(payload)
         return True
-    except Exception as e:
-        print(f"Error exporting to JSON: {e}")
-        return False 
\ No newline at end of file
+    except Exception:
+        logger.exception("Error exporting to JSON")
+        return False
@@ -7,25 +7,61 @@ import pytest
 import cv2
 import numpy as np
 import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
 from unittest.mock import Mock, patch, MagicMock
 
 
 class TestVideoLoading:
     """Test video loading and format validation"""
     
-    def test_load_valid_mp4_video(self):
+    def test_load_valid_mp4_video(self, tmp_path):
         """Test loading valid MP4 video file"""
-        # Mock video file path
-        video_path = "test_video.mp4"
+        video_path = tmp_path / "test_video.mp4"
+        video_path.write_bytes(b"\x00\x00\x00\x18ftypmp42" + b"\x00" * 16)
         
-        with patch('cv2.VideoCapture') as mock_cap, patch('os.path.exists', return_value=True):
-            mock_cap.return_value.isOpened.return_value = True
-            mock_cap.return_value.get.return_value = 30.0  # FPS
-            
+        with patch('cv2.VideoCapture') as mock_cap:
             # Test video loading function
-            result = load_video(video_path)
+            result = load_video(str(video_path))
             assert result is True
-            mock_cap.assert_called_once_with(video_path)
+            
+            # Validation reads the header only, no decoder is created
+            mock_cap.assert_not_called()
+    
+    def test_load_video_container_signatures(self, tmp_path):
+        """Test that AVI and MKV headers are recognised"""
+        headers = {
+            "clip.avi": b"RIFF\x00\x00\x00\x00AVI LIST",
+            "clip.mkv": b"\x1aE\xdf\xa3\x00\x00\x00\x00\x00\x00\x00\x1f",
+        }
+        
+        for filename, header in headers.items():
+            video_path = tmp_path / filename
+            video_path.write_bytes(header)
+            assert load_video(str(video_path)) is True
+    
+    def test_open_video_source_errors(self, tmp_path):
+        """Test that a failed capture open reports missing vs unreadable files"""
+        existing_path = tmp_path / "corrupted.mp4"
+        existing_path.write_bytes(b"not a video file at all")
+        
+        with patch('cv2.VideoCapture') as mock_cap:
+            mock_cap.return_value.isOpened.return_value = False
+            
+            with pytest.raises(FileNotFoundError):
+                open_video_source(str(tmp_path / "missing.mp4"))
+            with pytest.raises(ValueError, match="Cannot open video file"):
+                open_video_source(str(existing_path))
+    
+    def test_load_corrupted_video(self, tmp_path):
+        """Test handling of files without a video container header"""
+        video_path = tmp_path / "corrupted.mp4"
+        video_path.write_bytes(b"not a video file at all")
+        
+        with pytest.raises(ValueError, match="Cannot open video file"):
+            load_video(str(video_path))
     
     def test_load_invalid_video_format(self):
         """Test handling of invalid video formats"""
@@ -55,18 +91,19 @@ class TestFrameExtraction:
     def test_extract_frame_at_timestamp(self):
         """Test extracting frame at specific timestamp"""
         timestamp = 10.5  # 10.5 seconds
-        expected_frame_number = 315  # At 30 FPS
+        expected_position_ms = 10500.0
         
         with patch('cv2.VideoCapture') as mock_cap:
             mock_cap.return_value.get.return_value = 30.0  # FPS
             mock_cap.return_value.set.return_value = True
             mock_frame = np.zeros((480, 640, 3), dtype=np.uint8)
             mock_cap.return_value.read.return_value = (True, mock_frame)
+            src = VideoSource(mock_cap.return_value, fps=30.0, total_frames=3600, duration=120.0)
             
-            frame = extract_frame_at_timestamp(mock_cap.return_value, timestamp)
+            frame = extract_frame_at_timestamp(src, timestamp)
             
             # Verify frame position was set correctly
-            mock_cap.return_value.set.assert_called_with(cv2.CAP_PROP_POS_FRAMES, expected_frame_number)
+            mock_cap.return_value.set.assert_called_with(cv2.CAP_PROP_POS_MSEC, expected_position_ms)
             assert frame is not None
             assert frame.shape == (480, 640, 3)
     
@@ -77,9 +114,122 @@ class TestFrameExtraction:
         with patch('cv2.VideoCapture') as mock_cap:
             mock_cap.return_value.get.return_value = 30.0  # FPS
             mock_cap.return_value.read.return_value = (False, None)
+            src = VideoSource(mock_cap.return_value, fps=30.0, total_frames=3600, duration=120.0)
             
             with pytest.raises(ValueError, match="Timestamp beyond video duration"):
-                extract_frame_at_timestamp(mock_cap.return_value, timestamp)
+                extract_frame_at_timestamp(src, timestamp)
+            
+            # Out-of-range requests never reach the decoder
+            mock_cap.return_value.read.assert_not_called()
+    
+    def test_video_source_reads_metadata_once(self):
+        """Test that VideoSource caches capture metadata"""
+        with patch('cv2.VideoCapture') as mock_cap:
+            mock_cap.return_value.get.side_effect = lambda prop: {
+                cv2.CAP_PROP_FRAME_COUNT: 3600,
+                cv2.CAP_PROP_FPS: 30.0
+            }[prop]
+            
+            src = VideoSource.from_capture(mock_cap.return_value)
+            
+            assert src.fps == 30.0
+            assert src.total_frames == 3600
+            assert src.duration == 120.0
+            assert mock_cap.return_value.get.call_count == 2
+
+
+class TestFrameDecoder:
+    """Test background frame decoding"""
+    
+    def test_decoder_coalesces_pending_requests(self):
+        """Test that queued seek requests collapse into one decode of the newest"""
+        mock_cap = Mock()
+        mock_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        mock_cap.grab.return_value = True
+        mock_cap.retrieve.return_value = (True, mock_frame)
+        src = VideoSource(mock_cap, fps=30.0, total_frames=3600, duration=120.0)
+        
+        decoder = FrameDecoder(src)
+        for timestamp in (1.0, 2.0, 3.0):
+            decoder.request(timestamp)
+        decoder.start()
+        
+        timestamp, frame = decoder.out_q.get(timeout=1.0)
+        decoder.stop()
+        decoder.join(timeout=1.0)
+        
+        assert timestamp == 3.0
+        assert frame is mock_frame
+        mock_cap.set.assert_called_once_with(cv2.CAP_PROP_POS_MSEC, 3000.0)
+        assert not decoder.is_alive()
+    
+    def test_decoder_skips_decode_of_superseded_target(self):
+        """Test that a frame is grabbed but not decoded when a newer seek arrives"""
+        mock_cap = Mock()
+        mock_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        mock_cap.retrieve.return_value = (True, mock_frame)
+        src = VideoSource(mock_cap, fps=30.0, total_frames=3600, duration=120.0)
+        decoder = FrameDecoder(src)
+        
+        # The user keeps scrubbing while the first target is being grabbed
+        def grab():
+            if mock_cap.grab.call_count == 1:
+                decoder.request(5.0)
+            return True
+        mock_cap.grab.side_effect = grab
+        
+        decoder.request(1.0)
+        decoder.start()
+        
+        timestamp, frame = decoder.out_q.get(timeout=1.0)
+        decoder.stop()
+        decoder.join(timeout=1.0)
+        
+        assert timestamp == 5.0
+        assert mock_cap.grab.call_count == 2
+        mock_cap.retrieve.assert_called_once()
+    
+    def test_decoder_reuses_frame_buffers(self):
+        """Test that released buffers are reused and a held frame is never overwritten"""
+        mock_cap = Mock()
+        mock_cap.grab.return_value = True
+        
+        def retrieve(out=None):
+            # Fill each frame with its seek target so overwrites are visible
+            value = mock_cap.set.call_args[0][1] / 1000.0
+            if out is None:
+                out = np.empty((480, 640, 3), dtype=np.uint8)
+            out.fill(value)
+            return True, out
+        mock_cap.retrieve.side_effect = retrieve
+        src = VideoSource(mock_cap, fps=30.0, total_frames=3600, duration=120.0)
+        
+        decoder = FrameDecoder(src, max_frames=2)
+        decoder.start()
+        
+        def decode(timestamp):
+            decoder.request(timestamp)
+            while not decoder.out_q.queue or decoder.out_q.queue[-1][0] != timestamp:
+                time.sleep(0.001)
+        
+        decode(1.0)
+        decode(2.0)
+        _, held = decoder.latest_frame()
+        assert held[0, 0, 0] == 2
+        
+        # Many more decodes than pooled buffers, without taking a new frame
+        for timestamp in range(3, 11):
+            decode(float(timestamp))
+        assert (held == 2).all()
+        
+        # Taking a newer frame releases the held buffer for reuse
+        _, latest = decoder.latest_frame()
+        decoder.stop()
+        decoder.join(timeout=1.0)
+        
+        assert latest[0, 0, 0] == 10
+        assert any(buffer is held for buffer in decoder._free.queue)
+        assert not any(buffer is latest for buffer in decoder._free.queue)
 
 
 class TestTimelineCalculations:
@@ -103,6 +253,18 @@ class TestTimelineCalculations:
         timestamp = frame_to_timestamp(frame_number, fps)
         assert abs(timestamp - expected_timestamp) < 0.1  # Within tolerance
     
+    def test_batch_timestamp_frame_conversion(self):
+        """Test converting whole arrays of timestamps and frame numbers"""
+        fps = 30.0
+        timestamps = np.array([0.0, 10.5, 25.8, 119.9])
+        
+        frames = timestamps_to_frames(timestamps, fps)
+        assert frames.dtype == np.int64
+        assert frames.tolist() == [timestamp_to_frame(t, fps) for t in timestamps]
+        
+        round_trip = frames_to_timestamps(frames, fps)
+        assert np.all(np.abs(round_trip - timestamps) < 0.1)
+    
     def test_get_video_duration(self):
         """Test calculating total video duration"""
         with patch('cv2.VideoCapture') as mock_cap:
@@ -151,46 +313,214 @@ class TestBoundingBoxValidation:
         
         is_valid = validate_bounding_box(bbox, frame_size)
         assert is_valid is False
+    
+    def test_batch_bounding_box_validation(self):
+        """Test validating many bounding boxes at once"""
+        bboxes = np.array([
+            [100, 150, 200, 300],  # valid
+            [600, 450, 100, 100],  # outside frame
+            [-10, -20, 100, 100],  # negative coordinates
+            [100, 150, 0, 0],      # zero area
+        ], dtype=np.int32)
+        frame_size = (640, 480)
+        
+        valid = validate_bounding_boxes(bboxes, frame_size)
+        assert valid.tolist() == [True, False, False, False]
 
 
 # Mock functions to be implemented in actual annotation tool
+VALID_VIDEO_EXTENSIONS = frozenset(('.mp4', '.mov', '.avi', '.mkv'))
+
+
 def load_video(video_path):
     """Mock function for video loading with proper error handling"""
-    import cv2
-    import os
-    
     # Check file extension first
-    valid_extensions = ['.mp4', '.mov', '.avi', '.mkv']
-    file_ext = os.path.splitext(video_path)[1].lower()
-    if file_ext not in valid_extensions:
+    _, dot, ext = video_path.rpartition('.')
+    file_ext = (dot + ext).lower()
+    if file_ext not in VALID_VIDEO_EXTENSIONS:
         raise ValueError(f"Unsupported video format: {file_ext}")
     
-    # Check if file exists
-    if not os.path.exists(video_path):
-        raise FileNotFoundError(f"Video file not found: {video_path}")
+    # Validate the container from its header instead of initialising a
+    # decoder; the full VideoCapture is only opened once playback starts.
+    # A missing file surfaces from open() itself, no separate stat needed
+    try:
+        with open(video_path, 'rb') as f:
+            header = f.read(12)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Video file not found: {video_path}") from None
+    if not has_video_signature(header):
+        raise ValueError("Cannot open video file")
     
-    # Try to open video
+    return True
+
+
+# ISO BMFF (MP4/MOV) files start with a box: 4-byte size followed by its type
+ISO_BMFF_BOX_TYPES = frozenset((b'ftyp', b'moov', b'mdat', b'wide', b'free', b'skip'))
+MATROSKA_MAGIC = b'\x1aE\xdf\xa3'
+
+
+def has_video_signature(header):
+    """Check the first 12 bytes of a file for a supported container signature"""
+    return (header[4:8] in ISO_BMFF_BOX_TYPES or
+            (header[:4] == b'RIFF' and header[8:12] == b'AVI ') or
+            header[:4] == MATROSKA_MAGIC)
+
+
+def open_video_source(video_path):
+    """Open a full VideoCapture for playback"""
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
+        # Only pay for the existence check on the failure path
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"Video file not found: {video_path}")
         raise ValueError("Cannot open video file")
+    return VideoSource.from_capture(cap)
+
+
+@dataclass
+class VideoSource:
+    """Open video capture with its metadata read once up front"""
+    cap: object
+    fps: float
+    total_frames: int
+    duration: float
     
-    cap.release()
-    return True
+    @classmethod
+    def from_capture(cls, cap):
+        """Query capture metadata once and wrap it"""
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        duration = total_frames / fps if fps > 0 else 0.0
+        return cls(cap, fps, total_frames, duration)
 
 
-def extract_frame_at_timestamp(cap, timestamp):
+def extract_frame_at_timestamp(src, timestamp):
     """Mock function for frame extraction"""
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_number = int(timestamp * fps)
+    # Reject out-of-range timestamps without touching the decoder
+    if timestamp > src.duration:
+        raise ValueError("Timestamp beyond video duration")
     
-    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-    ret, frame = cap.read()
+    # Seek by time so the backend can jump to the nearest keyframe and
+    # decode forward; this is also correct for variable frame rate sources
+    src.cap.set(cv2.CAP_PROP_POS_MSEC, timestamp * 1000.0)
+    ret, frame = src.cap.read()
     
     if not ret:
         raise ValueError("Timestamp beyond video duration")
     return frame
 
 
+class FrameDecoder(threading.Thread):
+    """Background thread that decodes seek requests off the UI thread
+    
+    The UI posts timestamps with request() and picks up decoded frames with
+    latest_frame() (e.g. from a Tk after() tick). Requests that pile up while
+    a frame is being decoded are coalesced so only the newest one is decoded.
+    
+    Frames are decoded into recycled buffers. A buffer only goes back to the
+    free list once nobody can see it any more: when it is dropped from the
+    queue unseen, or when latest_frame() hands out a newer frame. So the frame
+    returned by latest_frame() stays valid until latest_frame() returns
+    another one. When the free list is empty a fresh buffer is allocated.
+    """
+    
+    def __init__(self, src, max_frames=8):
+        super().__init__(daemon=True)
+        self.src = src
+        self.in_q = queue.Queue()
+        self.out_q = queue.Queue(maxsize=max_frames)
+        # Queued frames, the one the UI holds, and the one being decoded
+        self._pool_size = max_frames + 2
+        self._free = queue.Queue()
+        self._held = None  # Frame last handed out by latest_frame()
+    
+    def request(self, timestamp):
+        """Ask for the frame at timestamp (non-blocking)"""
+        self.in_q.put(timestamp)
+    
+    def stop(self):
+        """Stop the decoder thread after the current request"""
+        self.in_q.put(None)
+    
+    def latest_frame(self):
+        """Return the newest decoded (timestamp, frame) pair, or None"""
+        latest = None
+        try:
+            while True:
+                newer = self.out_q.get_nowait()
+                if latest is not None:
+                    self._release(latest[1])  # Skipped without being shown
+                latest = newer
+        except queue.Empty:
+            pass
+        
+        if latest is not None:
+            if self._held is not None:
+                self._release(self._held)
+            self._held = latest[1]
+        return latest
+    
+    def run(self):
+        while True:
+            timestamp = self.in_q.get()
+            
+            # Drain pending requests and keep only the most recent one
+            try:
+                while timestamp is not None:
+                    timestamp = self.in_q.get_nowait()
+            except queue.Empty:
+                pass
+            
+            if timestamp is None:
+                return
+            if timestamp > self.src.duration or not fast_seek(self.src.cap, timestamp):
+                continue
+            
+            # A newer target arrived while seeking: skip decoding this frame
+            if not self.in_q.empty():
+                continue
+            
+            buffer = self._take_buffer()
+            frame = finish_seek(self.src.cap, buffer)
+            if frame is None:
+                if buffer is not None:
+                    self._release(buffer)
+                continue
+            
+            # Drop the oldest frame when the consumer falls behind; it was
+            # never handed out, so its buffer can be reused
+            if self.out_q.full():
+                try:
+                    self._release(self.out_q.get_nowait()[1])
+                except queue.Empty:
+                    pass
+            self.out_q.put_nowait((timestamp, frame))
+    
+    def _take_buffer(self):
+        """Return a free frame buffer, or None to have the decoder allocate one"""
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            return None
+    
+    def _release(self, frame):
+        """Return a frame buffer nobody references to the free list"""
+        if self._free.qsize() < self._pool_size:
+            self._free.put_nowait(frame)
+
+
+def fast_seek(cap, timestamp):
+    """Seek to timestamp and grab the frame without decoding it"""
+    cap.set(cv2.CAP_PROP_POS_MSEC, timestamp * 1000.0)
+    return cap.grab()
+
+
+def finish_seek(cap, out=None):
+    """Decode the frame grabbed by fast_seek (into out if given), or return None"""
+    ret, frame = cap.retrieve() if out is None else cap.retrieve(out)
+    return frame if ret else None
+
+
 def timestamp_to_frame(timestamp, fps):
     """Convert timestamp to frame number"""
     return int(timestamp * fps)
@@ -201,6 +531,16 @@ def frame_to_timestamp(frame_number, fps):
     return frame_number / fps
 
 
+def timestamps_to_frames(timestamps, fps):
+    """Convert an array of timestamps to frame numbers in one vectorized pass"""
+    return (np.asarray(timestamps, dtype=np.float64) * fps).astype(np.int64)
+
+
+def frames_to_timestamps(frame_numbers, fps):
+    """Convert an array of frame numbers to timestamps in one vectorized pass"""
+    return np.asarray(frame_numbers).astype(np.float64) / fps
+
+
 def get_video_duration(cap):
     """Get total video duration in seconds"""
     frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
@@ -213,15 +553,13 @@ def validate_bounding_box(bbox, frame_size):
     if len(bbox) != 4:
         return False
     
-    x, y, width, height = bbox
+    return bool(validate_bounding_boxes(np.asarray([bbox]), frame_size)[0])
+
+
+def validate_bounding_boxes(bboxes, frame_size):
+    """Validate an (N, 4) array of [x, y, width, height] boxes in one pass"""
+    x, y, width, height = np.asarray(bboxes).T
     frame_width, frame_height = frame_size
     
-    # Check if bounding box is within frame boundaries
-    if x < 0 or y < 0:
-        return False
-    if x + width > frame_width or y + height > frame_height:
-        return False
-    if width <= 0 or height <= 0:
-        return False
-    
-    return True 
\ No newline at end of file
+    return ((x >= 0) & (y >= 0) & (width > 0) & (height > 0) &
+            (x + width <= frame_width) & (y + height <= frame_height))
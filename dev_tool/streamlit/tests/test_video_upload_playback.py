@@ -7,12 +7,16 @@ import pytest
 import os
 import tempfile
 import shutil
+import time
+import gc
+import weakref
 from unittest.mock import Mock, patch, MagicMock
 import streamlit as st
 import pandas as pd
 import json
 from pathlib import Path
 import cv2
+import numpy as np
 
 # Import modules to test
 import sys
@@ -20,6 +24,17 @@ sys.path.append('..')
 from video_processor import VideoProcessor
 from annotation_manager import AnnotationManager
 
+# File naming fixtures shared by the data organization tests
+SESSION_VIDEO_NAME = "surf_session_001.mp4"
+SESSION_TIMESTAMP = "20241220_143000"
+SESSION_VIDEO_SAFE = SESSION_VIDEO_NAME.replace('.', '_')
+SESSION_JSON_NAME = f"annotations_{SESSION_VIDEO_SAFE}_{SESSION_TIMESTAMP}.json"
+SESSION_CSV_NAME = f"annotations_{SESSION_VIDEO_SAFE}_{SESSION_TIMESTAMP}.csv"
+
+TEST_VIDEO_NAME = "test_video.mp4"
+TEST_ANNOTATION_NAME = "annotations_test_video_mp4_20241220_143000.json"
+TEST_EXPORT_NAME = "annotations_test_video_mp4_20241220_143000.csv"
+
 
 class TestVideoUploadHandling:
     """Test video file upload and storage"""
@@ -85,20 +100,16 @@ class TestVideoUploadHandling:
         os.makedirs(video_dir, exist_ok=True)
         
         for filename in test_files:
-            video_path = os.path.join(video_dir, filename)
+            original_ext = os.path.splitext(filename)[1]
+            video_path = Path(video_dir, filename)
             
             # Simulate upload
-            with open(video_path, "wb") as f:
-                f.write(self.test_video_data)
+            video_path.touch()
             
-            # Verify filename preservation
-            assert os.path.exists(video_path)
-            assert os.path.basename(video_path) == filename
-            
-            # Verify extension preservation
-            original_ext = os.path.splitext(filename)[1]
-            stored_ext = os.path.splitext(video_path)[1]
-            assert stored_ext == original_ext
+            # Verify filename and extension preservation
+            assert video_path.exists()
+            assert video_path.name == filename
+            assert video_path.suffix == original_ext
 
 
 class TestVideoPlaybackControls:
@@ -178,6 +189,148 @@ class TestVideoPlaybackControls:
         playback_state['is_playing'] = not playback_state['is_playing'] 
         assert playback_state['is_playing'] is False
     
+    def test_frame_sequence_decodes_only_sampled_frames(self):
+        """Test that frame sequences seek once and skip unsampled frames"""
+        mock_cap = Mock()
+        mock_cap.grab.return_value = True
+        mock_cap.retrieve.return_value = (True, np.zeros((1080, 1920, 3), dtype=np.uint8))
+        self.processor.cap = mock_cap
+        
+        frames = self.processor.extract_frame_sequence(10.0, 12.0, step=1.0)
+        
+        assert [timestamp for timestamp, _ in frames] == [10.0, 11.0, 12.0]
+        mock_cap.set.assert_called_once_with(cv2.CAP_PROP_POS_FRAMES, 300)
+        assert mock_cap.grab.call_count == 61  # frames 300..360
+        assert mock_cap.retrieve.call_count == 3
+        
+        self.processor.cap = None
+    
+    def test_repeated_seeks_served_from_frame_cache(self):
+        """Test that scrubbing back to a decoded frame does not decode it again"""
+        mock_cap = Mock()
+        mock_cap.read.side_effect = lambda: (True, np.zeros((1080, 1920, 3), dtype=np.uint8))
+        self.processor.cap = mock_cap
+        self.processor.PREFETCH_FRAMES = 0
+        
+        first = self.processor.get_frame_at_time(10.0)
+        self.processor.get_frame_at_time(11.0)
+        again = self.processor.get_frame_at_time(10.0)
+        
+        assert again is first
+        assert mock_cap.read.call_count == 2
+        assert not first.flags.writeable  # Shared frames are read-only
+        
+        # Cleanup drops the cache
+        self.processor.cleanup()
+        assert not self.processor._frame_cache
+    
+    def test_sequential_frames_skip_seek(self):
+        """Test that reading consecutive frames only seeks for the first one"""
+        mock_cap = Mock()
+        mock_cap.read.side_effect = lambda: (True, np.zeros((4, 4, 3), dtype=np.uint8))
+        self.processor.cap = mock_cap
+        self.processor.PREFETCH_FRAMES = 0
+        
+        for frame_number in range(100, 105):
+            assert self.processor.get_frame_at_frame_number(frame_number) is not None
+        assert mock_cap.set.call_count == 1
+        
+        # Jumping elsewhere seeks again
+        self.processor.get_frame_at_frame_number(500)
+        assert mock_cap.set.call_count == 2
+        
+        self.processor.cleanup()
+        assert self.processor._last_pos == -2
+    
+    def test_decoder_thread_prefetches_following_frames(self):
+        """Test that the decoder thread decodes ahead of the requested frame"""
+        mock_cap = Mock()
+        mock_cap.read.side_effect = lambda: (True, np.zeros((4, 4, 3), dtype=np.uint8))
+        self.processor.cap = mock_cap
+        
+        assert self.processor.get_frame_at_frame_number(300) is not None
+        
+        deadline = time.time() + 2.0
+        while len(self.processor._frame_cache) < 5 and time.time() < deadline:
+            time.sleep(0.01)
+        assert list(self.processor._frame_cache) == [300, 301, 302, 303, 304]
+        
+        # Prefetched frames are served without decoding again
+        reads = mock_cap.read.call_count
+        assert self.processor.get_frame_at_frame_number(303) is not None
+        assert mock_cap.read.call_count == reads
+        
+        self.processor.cleanup()
+        assert self.processor._decoder is None
+    
+    def test_bounding_box_validation_scalar_and_batch(self):
+        """Test that single and batched bounding box validation agree"""
+        bboxes = [
+            [100, 100, 200, 150],   # Valid
+            [1720, 880, 200, 200],  # Touches the bottom-right corner
+            [-10, 100, 200, 150],   # Negative x
+            [100, 100, 0, 150],     # Zero width
+            [1800, 100, 200, 150],  # Past the right edge
+            [100, 1000, 200, 150],  # Past the bottom edge
+        ]
+        
+        mask = self.processor.validate_bounding_boxes(bboxes)
+        
+        assert mask.tolist() == [True, True, False, False, False, False]
+        assert [self.processor.validate_bounding_box(b) for b in bboxes] == mask.tolist()
+    
+    def test_bulk_timestamp_frame_conversion(self):
+        """Test that array conversions match the scalar helpers"""
+        timestamps = [0.0, 0.5, 10.25, 67.33, 119.9]
+        frames = self.processor.timestamps_to_frames(timestamps)
+        
+        assert frames.dtype == np.int64
+        assert frames.tolist() == [self.processor.timestamp_to_frame(t) for t in timestamps]
+        
+        back = self.processor.frames_to_timestamps(frames)
+        assert back.tolist() == [self.processor.frame_to_timestamp(int(f)) for f in frames]
+    
+    def test_preview_frames_downscaled_to_preview_width(self):
+        """Test that preview frames keep aspect ratio at the preview width"""
+        mock_cap = Mock()
+        mock_cap.read.side_effect = lambda: (True, np.zeros((1080, 1920, 3), dtype=np.uint8))
+        self.processor.cap = mock_cap
+        self.processor.PREFETCH_FRAMES = 0
+        self.processor.preview_width = 800
+        
+        preview = self.processor.get_preview_frame_at_time(10.0)
+        assert preview.shape == (450, 800, 3)
+        assert not preview.flags.writeable
+        
+        # Frames already narrower than the preview are not upscaled
+        self.processor.preview_width = 2560
+        preview = self.processor.get_preview_frame_at_time(10.0)
+        assert preview.shape == (1080, 1920, 3)
+        assert not preview.flags.writeable
+        
+        self.processor.cap = None
+    
+    def test_decoder_thread_does_not_keep_processor_alive(self):
+        """Test that an abandoned processor is collected and its decoder stopped"""
+        processor = VideoProcessor()
+        processor.fps = 30.0
+        processor.duration = 120.0
+        processor.frame_count = 3600
+        processor.is_loaded = True
+        processor.cap = Mock()
+        processor.cap.read.side_effect = lambda: (True, np.zeros((4, 4, 3), dtype=np.uint8))
+        
+        assert processor.get_frame_at_time(1.0) is not None
+        decoder = processor._decoder
+        ref = weakref.ref(processor)
+        
+        del processor
+        gc.collect()
+        decoder.join(timeout=2.0)
+        
+        assert ref() is None
+        assert not decoder.is_alive()
+    
     def test_video_timeline_slider(self):
         """Test video timeline slider functionality"""
         # Test slider range
@@ -226,7 +379,7 @@ class TestVideoFileValidation:
     def test_video_metadata_extraction(self):
         """Test extraction of video metadata"""
         # Mock video capture
-        with patch('cv2.VideoCapture') as mock_cap, patch('os.path.exists', return_value=True):
+        with patch('cv2.VideoCapture') as mock_cap, patch('os.stat'):
             mock_cap.return_value.isOpened.return_value = True
             mock_cap.return_value.get.side_effect = lambda prop: {
                 cv2.CAP_PROP_FPS: 30.0,
@@ -245,6 +398,18 @@ class TestVideoFileValidation:
             assert self.processor.width == 1920
             assert self.processor.height == 1080
             assert self.processor.duration == 120.0  # 3600/30
+    
+    def test_load_video_requests_hardware_decoding(self):
+        """Test that playback captures are opened with hardware acceleration allowed"""
+        with patch('cv2.VideoCapture') as mock_cap, patch('os.stat'):
+            mock_cap.return_value.isOpened.return_value = True
+            mock_cap.return_value.get.return_value = 30.0
+            
+            assert self.processor.load_video("test_video.mp4") is True
+            
+            args = mock_cap.call_args[0]
+            assert args[0] == "test_video.mp4"
+            assert args[2] == [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
 
 
 class TestDataOrganization:
@@ -276,41 +441,31 @@ class TestDataOrganization:
     
     def test_annotation_file_naming(self):
         """Test annotation file naming convention"""
-        video_name = "surf_session_001.mp4"
-        timestamp = "20241220_143000"
-        
         # Test JSON filename
-        video_name_safe = video_name.replace('.', '_')
-        json_filename = f"annotations_{video_name_safe}_{timestamp}.json"
-        assert "annotations_" in json_filename
-        assert "surf_session_001_mp4" in json_filename
-        assert timestamp in json_filename
-        assert json_filename.endswith('.json')
+        assert SESSION_JSON_NAME.startswith("annotations_")
+        assert "surf_session_001_mp4" in SESSION_JSON_NAME
+        assert SESSION_TIMESTAMP in SESSION_JSON_NAME
+        assert SESSION_JSON_NAME.endswith('.json')
         
         # Test CSV filename  
-        csv_filename = f"annotations_{video_name_safe}_{timestamp}.csv"
-        assert "annotations_" in csv_filename
-        assert "surf_session_001_mp4" in csv_filename
-        assert timestamp in csv_filename
-        assert csv_filename.endswith('.csv')
+        assert SESSION_CSV_NAME.startswith("annotations_")
+        assert "surf_session_001_mp4" in SESSION_CSV_NAME
+        assert SESSION_TIMESTAMP in SESSION_CSV_NAME
+        assert SESSION_CSV_NAME.endswith('.csv')
     
     def test_file_path_construction(self):
         """Test proper file path construction"""
-        video_name = "test_video.mp4"
-        
         # Test video path
-        video_path = os.path.join("data/videos", video_name)
+        video_path = os.path.join("data/videos", TEST_VIDEO_NAME)
         assert video_path == "data/videos/test_video.mp4"
         
         # Test annotation path
-        annotation_name = "annotations_test_video_mp4_20241220_143000.json"
-        annotation_path = os.path.join("data/annotations", annotation_name)
+        annotation_path = os.path.join("data/annotations", TEST_ANNOTATION_NAME)
         assert annotation_path.startswith("data/annotations/")
         assert annotation_path.endswith(".json")
         
         # Test export path
-        export_name = "annotations_test_video_mp4_20241220_143000.csv"
-        export_path = os.path.join("data/exports", export_name)
+        export_path = os.path.join("data/exports", TEST_EXPORT_NAME)
         assert export_path.startswith("data/exports/")
         assert export_path.endswith(".csv")
 
@@ -6,9 +6,27 @@ Contains UI helper classes and components for the annotation tool
 import streamlit as st
 import cv2
 import numpy as np
+from functools import lru_cache
 from typing import Optional, Tuple, List
 
 
+# Base BGR colors for create_color_palette
+PALETTE_BGR = np.array([
+    (0, 255, 0),    # Green
+    (255, 0, 0),    # Blue
+    (0, 0, 255),    # Red
+    (255, 255, 0),  # Cyan
+    (255, 0, 255),  # Magenta
+    (0, 255, 255),  # Yellow
+    (128, 0, 128),  # Purple
+    (255, 165, 0),  # Orange
+], dtype=np.uint8)
+
+# Per-surfer colors for boxes and timeline bars, indexed by surfer ID
+_COLORS = PALETTE_BGR[:5]
+SURFER_COLORS = [tuple(c) for c in _COLORS.tolist()]
+
+
 class VideoPlayer:
     """Video player component for Streamlit interface"""
     
@@ -16,6 +34,7 @@ class VideoPlayer:
         self.current_frame = None
         self.is_playing = False
         self.playback_speed = 1.0
+        self._scratch = None  # Reused buffer for annotated display frames
     
     def display_frame(self, frame: np.ndarray, annotations: List = None):
         """
@@ -26,43 +45,73 @@ class VideoPlayer:
             annotations: List of annotation overlays
         """
         if frame is not None:
-            display_frame = frame.copy()
-            
-            # Draw annotations if provided
+            # Draw annotations on the reused scratch buffer, never the source
             if annotations:
-                display_frame = self.draw_annotations(display_frame, annotations)
+                frame = self.draw_annotations(self._copy_to_scratch(frame), annotations,
+                                              inplace=True)
             
             # Display in Streamlit
-            st.image(display_frame, channels="BGR", use_container_width=True)
+            st.image(frame, channels="BGR", use_container_width=True)
+    
+    def _copy_to_scratch(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Copy frame into the persistent scratch buffer
+        
+        Args:
+            frame: Source frame
+            
+        Returns:
+            numpy.ndarray: Scratch buffer holding a copy of frame
+        """
+        if (self._scratch is None or self._scratch.shape != frame.shape
+                or self._scratch.dtype != frame.dtype):
+            self._scratch = np.empty_like(frame)
+        np.copyto(self._scratch, frame)
+        return self._scratch
     
-    def draw_annotations(self, frame: np.ndarray, annotations: List) -> np.ndarray:
+    def draw_annotations(self, frame: np.ndarray, annotations: List,
+                         inplace: bool = False) -> np.ndarray:
         """
         Draw annotations on frame
         
         Args:
             frame: Input frame
             annotations: List of annotations to draw
+            inplace: Draw directly on frame instead of a copy; frame must be writable
             
         Returns:
             numpy.ndarray: Frame with annotations
         """
-        annotated_frame = frame.copy()
-        
-        for annotation in annotations:
-            if 'bbox' in annotation and annotation['bbox']:
-                x, y, w, h = annotation['bbox']
-                
-                # Color based on surfer ID
-                colors = [(0, 255, 0), (255, 0, 0), (0, 0, 255), (255, 255, 0), (255, 0, 255)]
-                color = colors[annotation.get('id', 0) % len(colors)]
-                
-                # Draw rectangle
-                cv2.rectangle(annotated_frame, (x, y), (x + w, y + h), color, 2)
-                
-                # Draw label
-                label = f"Surfer {annotation.get('id', '?')}"
-                cv2.putText(annotated_frame, label, (x, y - 10), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+        annotated_frame = frame if inplace else frame.copy()
+        
+        boxed = [a for a in annotations if 'bbox' in a and a['bbox']]
+        if not boxed:
+            return annotated_frame
+        
+        # Color based on surfer ID
+        color_idx = np.array([a.get('id', 0) for a in boxed]) % len(SURFER_COLORS)
+        
+        # Rectangle corners for all boxes at once: (N, 4 corners, xy)
+        x, y, w, h = np.array([a['bbox'] for a in boxed], dtype=np.int32).T
+        corners = np.stack([
+            np.stack([x, y], axis=1),
+            np.stack([x + w, y], axis=1),
+            np.stack([x + w, y + h], axis=1),
+            np.stack([x, y + h], axis=1),
+        ], axis=1)
+        
+        # Draw rectangles, one polylines call per color
+        for ci in np.unique(color_idx):
+            cv2.polylines(annotated_frame, list(corners[color_idx == ci]), True,
+                          SURFER_COLORS[ci], 2)
+        
+        # Draw labels
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        for annotation, ci, label_x, label_y in zip(boxed, color_idx.tolist(),
+                                                    x.tolist(), (y - 10).tolist()):
+            label = f"Surfer {annotation.get('id', '?')}"
+            cv2.putText(annotated_frame, label, (label_x, label_y), font, 0.7,
+                        SURFER_COLORS[ci], 2)
         
         return annotated_frame
     
@@ -79,8 +128,8 @@ class VideoPlayer:
             int: Position on timeline
         """
         if duration > 0:
-            position = int((current_time / duration) * width)
-            return max(0, min(position, width))
+            # Clamp in the time domain so the pixel needs no second clamp
+            return int((max(0.0, min(current_time, duration)) / duration) * width)
         return 0
 
 
@@ -268,19 +317,14 @@ class BoundingBoxTool:
         
         x, y, width, height = bbox
         
-        # Check for negative coordinates or zero area
-        if x < 0 or y < 0 or width <= 0 or height <= 0:
-            return False
-        
-        # Check if bounding box is within frame boundaries
-        if x + width > frame_width or y + height > frame_height:
-            return False
-        
-        return True
+        # Positive area, non-negative origin and inside the frame, combined
+        # without short-circuiting
+        return bool((width > 0) & (height > 0) & (x >= 0) & (y >= 0)
+                    & (x + width <= frame_width) & (y + height <= frame_height))
     
     def draw_bbox_on_frame(self, frame: np.ndarray, bbox: List[int], 
                           color: Tuple[int, int, int] = (0, 255, 0), 
-                          thickness: int = 2) -> np.ndarray:
+                          thickness: int = 2, inplace: bool = False) -> np.ndarray:
         """
         Draw bounding box on frame
         
@@ -289,6 +333,7 @@ class BoundingBoxTool:
             bbox: Bounding box coordinates
             color: Rectangle color (B, G, R)
             thickness: Line thickness
+            inplace: Draw directly on frame instead of a copy; frame must be writable
             
         Returns:
             numpy.ndarray: Frame with bounding box
@@ -296,12 +341,12 @@ class BoundingBoxTool:
         if not self.validate_bbox(bbox, frame.shape[1], frame.shape[0]):
             return frame
         
-        frame_copy = frame.copy()
+        target = frame if inplace else frame.copy()
         x, y, width, height = bbox
         
-        cv2.rectangle(frame_copy, (x, y), (x + width, y + height), color, thickness)
+        cv2.rectangle(target, (x, y), (x + width, y + height), color, thickness)
         
-        return frame_copy
+        return target
     
     def get_bbox_center(self, bbox: List[int]) -> Tuple[int, int]:
         """
@@ -348,6 +393,17 @@ class TimelineVisualization:
     def __init__(self):
         self.timeline_height = 50
         self.annotation_height = 20
+        self._bg_cache = None  # Timeline without the current-time cursor
+        self._bg_key = None
+        self._last_img = None  # Last returned timeline, cursor included
+        self._last_key = None
+    
+    def invalidate(self):
+        """Force the next create_timeline_image call to redraw everything"""
+        self._bg_cache = None
+        self._bg_key = None
+        self._last_img = None
+        self._last_key = None
     
     def create_timeline_image(self, duration: float, surfers: List, 
                             current_time: float, width: int = 800) -> np.ndarray:
@@ -363,28 +419,63 @@ class TimelineVisualization:
         Returns:
             numpy.ndarray: Timeline image
         """
+        # Only the cursor moves during playback; redraw the rest on changes
+        key = (duration, width,
+               tuple((s['id'], s.get('start_time'), s.get('end_time')) for s in surfers))
+        current_x = int((current_time / duration) * width)
+        
+        # Sub-pixel time changes leave the image as it was
+        if key == self._bg_key and current_x == self._last_key:
+            return self._last_img
+        
+        if key != self._bg_key:
+            self._bg_cache = self._draw_timeline_background(duration, surfers, width)
+            self._bg_key = key
+        
+        timeline_img = self._bg_cache.copy()
+        
+        # Draw current time indicator: the pixels a 2px cv2.line covers
+        # (columns x-1..x+1), filled as a slice
+        timeline_img[:, max(0, current_x - 1):max(0, current_x + 2)] = (0, 255, 255)
+        
+        self._last_img = timeline_img
+        self._last_key = current_x
+        return timeline_img
+    
+    def _draw_timeline_background(self, duration: float, surfers: List,
+                                  width: int) -> np.ndarray:
+        """
+        Draw time markers and surfer annotations (everything but the cursor)
+        
+        Args:
+            duration: Video duration in seconds
+            surfers: List of surfer annotations
+            width: Timeline width in pixels
+            
+        Returns:
+            numpy.ndarray: Timeline background image
+        """
         height = self.timeline_height + len(surfers) * self.annotation_height
         timeline_img = np.zeros((height, width, 3), dtype=np.uint8)
         
         # Draw main timeline
         cv2.rectangle(timeline_img, (0, 0), (width, self.timeline_height), (50, 50, 50), -1)
         
-        # Draw time markers
-        for i in range(0, int(duration) + 1, 10):  # Every 10 seconds
-            x = int((i / duration) * width)
-            cv2.line(timeline_img, (x, 0), (x, self.timeline_height), (100, 100, 100), 1)
-            
-            # Add time label
-            cv2.putText(timeline_img, f"{i}s", (x + 2, 15), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+        # Draw time markers every 10 seconds, all tick lines in one call
+        ticks = np.arange(0, int(duration) + 1, 10)
+        tick_xs = (ticks * (width / duration)).astype(np.int32)
+        segments = np.zeros((len(tick_xs), 2, 2), dtype=np.int32)
+        segments[:, :, 0] = tick_xs[:, None]
+        segments[:, 1, 1] = self.timeline_height
+        cv2.polylines(timeline_img, list(segments), False, (100, 100, 100), 1)
         
-        # Draw current time indicator
-        current_x = int((current_time / duration) * width)
-        cv2.line(timeline_img, (current_x, 0), (current_x, height), (0, 255, 255), 2)
+        # Add time labels
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        for t, x in zip(ticks.tolist(), tick_xs.tolist()):
+            cv2.putText(timeline_img, _tick_label(t), (x + 2, 15),
+                        font, 0.4, (255, 255, 255), 1)
         
         # Draw surfer annotations
-        colors = [(0, 255, 0), (255, 0, 0), (0, 0, 255), (255, 255, 0), (255, 0, 255)]
-        
         for i, surfer in enumerate(surfers):
             y_start = self.timeline_height + i * self.annotation_height
             y_end = y_start + self.annotation_height
@@ -397,11 +488,11 @@ class TimelineVisualization:
                 
                 if end_time is not None:
                     end_x = int((end_time / duration) * width)
-                    color = colors[surfer['id'] % len(colors)]
+                    color = SURFER_COLORS[surfer['id'] % len(SURFER_COLORS)]
                     cv2.rectangle(timeline_img, (start_x, y_start), (end_x, y_end), color, -1)
                 else:
                     # Only start time - draw ongoing annotation
-                    color = colors[surfer['id'] % len(colors)]
+                    color = SURFER_COLORS[surfer['id'] % len(SURFER_COLORS)]
                     cv2.rectangle(timeline_img, (start_x, y_start), (width, y_end), 
                                 (*color[:2], color[2]//2), -1)  # Semi-transparent
                 
@@ -423,17 +514,20 @@ class TimelineVisualization:
         Returns:
             float: Timestamp in seconds
         """
-        # Handle boundary conditions
-        if click_x <= 0:
-            return 0.0
-        if click_x >= timeline_width:
-            return duration
-        
-        ratio = click_x / timeline_width
-        return ratio * duration
+        if timeline_width <= 0:
+            return 0.0 if click_x <= 0 else duration
+        
+        # Clamp the click to the timeline, then scale
+        return (max(0, min(click_x, timeline_width)) / timeline_width) * duration
 
 
 # Utility functions for UI components
+@lru_cache(maxsize=1024)
+def _tick_label(seconds: int) -> str:
+    """Timeline tick label text, cached across redraws"""
+    return f"{seconds}s"
+
+
 def format_time(seconds: float) -> str:
     """
     Format time in seconds to MM:SS format
@@ -459,20 +553,10 @@ def create_color_palette(num_colors: int) -> List[Tuple[int, int, int]]:
     Returns:
         list: List of BGR color tuples
     """
-    base_colors = [
-        (0, 255, 0),    # Green
-        (255, 0, 0),    # Blue
-        (0, 0, 255),    # Red
-        (255, 255, 0),  # Cyan
-        (255, 0, 255),  # Magenta
-        (0, 255, 255),  # Yellow
-        (128, 0, 128),  # Purple
-        (255, 165, 0),  # Orange
-    ]
+    if num_colors <= 0:
+        return []
     
     # Repeat colors if needed
-    colors = []
-    for i in range(num_colors):
-        colors.append(base_colors[i % len(base_colors)])
-    
-    return colors 
\ No newline at end of file
+    repeats = -(-num_colors // len(PALETTE_BGR))
+    colors = np.tile(PALETTE_BGR, (repeats, 1))[:num_colors]
+    return list(map(tuple, colors.tolist()))
\ No newline at end of file
@@ -6,12 +6,40 @@ Handles video loading, frame extraction, and timeline calculations
 import cv2
 import numpy as np
 import os
+import queue
+import threading
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Optional, Tuple
 
 
+VALID_VIDEO_EXTENSIONS = frozenset({'.mp4', '.mov', '.avi', '.mkv', '.wmv'})
+
+# Open parameters for playback captures: let the backend decode on the GPU
+# when a hardware decoder is available (it falls back to software otherwise)
+CAPTURE_PARAMS = [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+
+
 class VideoProcessor:
     """Handles video file operations and frame extraction"""
     
+    # Gap (in frames) beyond which extract_frame_sequence seeks instead of
+    # grabbing its way forward
+    MAX_SEQUENTIAL_SKIP = 120
+    
+    # Memory budget for recently decoded frames kept by _read_frame
+    MAX_CACHE_BYTES = 256 << 20
+    
+    # Frames decoded ahead of each request by the decoder thread
+    PREFETCH_FRAMES = 4
+    
+    # Seconds to wait for the decoder thread before giving up on a frame
+    DECODE_TIMEOUT = 5.0
+    
+    # Width the UI displays frames at; wider frames are downscaled for preview
+    DEFAULT_PREVIEW_WIDTH = 960
+    
     def __init__(self):
         self.cap = None
         self.video_path = None
@@ -21,6 +49,20 @@ class VideoProcessor:
         self.width = 0
         self.height = 0
         self.is_loaded = False
+        self.preview_width = self.DEFAULT_PREVIEW_WIDTH
+        self._frame_cache = OrderedDict()
+        self._cache_bytes = 0
+        # Index of the frame the capture decoded last (-2: position unknown)
+        self._last_pos = -2
+        
+        # Decoder thread state; the thread is started on the first request.
+        # _cap_lock guards the capture and the frame cache.
+        self._cap_lock = threading.RLock()
+        self._requests = queue.Queue()
+        self._results = queue.Queue(maxsize=self.PREFETCH_FRAMES)
+        self._decoder = None
+        # Stops the decoder when the processor is collected or at exit
+        self._decoder_finalizer = None
     
     def load_video(self, video_path: str) -> bool:
         """
@@ -34,17 +76,21 @@ class VideoProcessor:
         """
         try:
             # Validate file exists
-            if not os.path.exists(video_path):
-                raise FileNotFoundError(f"Video file not found: {video_path}")
+            try:
+                os.stat(video_path)
+            except OSError:
+                raise FileNotFoundError(f"Video file not found: {video_path}") from None
             
             # Validate file extension
-            valid_extensions = ['.mp4', '.mov', '.avi', '.mkv', '.wmv']
-            file_ext = os.path.splitext(video_path)[1].lower()
-            if file_ext not in valid_extensions:
+            file_ext = _video_extension(video_path)
+            if file_ext not in VALID_VIDEO_EXTENSIONS:
                 raise ValueError(f"Unsupported video format: {file_ext}")
             
-            # Open video capture
-            self.cap = cv2.VideoCapture(video_path)
+            # Open video capture (frames cached for a previous video are stale)
+            self._stop_decoder()
+            self._clear_frame_cache()
+            self._last_pos = -2
+            self.cap = cv2.VideoCapture(video_path, cv2.CAP_ANY, CAPTURE_PARAMS)
             
             if not self.cap.isOpened():
                 raise ValueError("Cannot open video file - may be corrupted or unsupported format")
@@ -78,7 +124,8 @@ class VideoProcessor:
             timestamp: Time in seconds
             
         Returns:
-            numpy.ndarray: Frame image or None if error
+            numpy.ndarray: Frame image or None if error. The array is shared
+            with the frame cache and read-only; copy it before drawing on it.
         """
         if not self.is_loaded or not self.cap:
             return None
@@ -91,21 +138,35 @@ class VideoProcessor:
             # Calculate frame number
             frame_number = int(timestamp * self.fps)
             
-            # Seek to frame
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-            
-            # Read frame
-            ret, frame = self.cap.read()
-            
-            if ret:
-                return frame
-            else:
-                return None
+            return self._decode(frame_number)
                 
         except Exception as e:
             print(f"Error extracting frame at time {timestamp}: {str(e)}")
             return None
     
+    def get_preview_frame_at_time(self, timestamp: float) -> Optional[np.ndarray]:
+        """
+        Extract frame at timestamp, downscaled to preview_width for display
+        
+        Frames no wider than preview_width are returned unscaled.
+        
+        Args:
+            timestamp: Time in seconds
+            
+        Returns:
+            numpy.ndarray: Read-only frame image or None if error
+        """
+        frame = self.get_frame_at_time(timestamp)
+        if frame is None or self.preview_width <= 0 or frame.shape[1] <= self.preview_width:
+            return frame
+        
+        preview_height = max(1, int(self.preview_width * frame.shape[0] / frame.shape[1]))
+        preview = cv2.resize(frame, (self.preview_width, preview_height),
+                             interpolation=cv2.INTER_AREA)
+        # Match the unscaled path so callers copy either way
+        preview.flags.writeable = False
+        return preview
+    
     def get_frame_at_frame_number(self, frame_number: int) -> Optional[np.ndarray]:
         """
         Extract frame at specific frame number
@@ -114,7 +175,8 @@ class VideoProcessor:
             frame_number: Frame index
             
         Returns:
-            numpy.ndarray: Frame image or None if error
+            numpy.ndarray: Frame image or None if error. The array is shared
+            with the frame cache and read-only; copy it before drawing on it.
         """
         if not self.is_loaded or not self.cap:
             return None
@@ -124,21 +186,154 @@ class VideoProcessor:
             if frame_number < 0 or frame_number >= self.frame_count:
                 return None
             
-            # Seek to frame
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-            
-            # Read frame
-            ret, frame = self.cap.read()
-            
-            if ret:
-                return frame
-            else:
-                return None
+            return self._decode(frame_number)
                 
         except Exception as e:
             print(f"Error extracting frame {frame_number}: {str(e)}")
             return None
     
+    def request_frame(self, frame_number: int):
+        """
+        Ask the decoder thread for a frame without waiting for it
+        
+        The frame is posted to the result queue, and the frames following
+        it are prefetched into the frame cache while the caller renders.
+        
+        Args:
+            frame_number: Frame index
+        """
+        if self._decoder is None or not self._decoder.is_alive():
+            # The thread only holds a weak reference, so an abandoned
+            # processor is still collected (and cleaned up by __del__)
+            self._decoder = threading.Thread(target=_run_decoder,
+                                             args=(weakref.ref(self), self._requests),
+                                             name="VideoDecoder", daemon=True)
+            self._decoder.start()
+            # finalize also runs at interpreter exit, so the thread never
+            # dies mid-decode
+            self._decoder_finalizer = weakref.finalize(
+                self, _stop_decoder_thread, self._requests, self._decoder,
+                self.DECODE_TIMEOUT)
+        self._requests.put(frame_number)
+    
+    def _decode(self, frame_number: int) -> Optional[np.ndarray]:
+        """
+        Return a frame from the cache or from the decoder thread
+        
+        Args:
+            frame_number: Frame index
+            
+        Returns:
+            numpy.ndarray: Frame image or None if error
+        """
+        with self._cap_lock:
+            frame = self._frame_cache.get(frame_number)
+            if frame is not None:
+                self._frame_cache.move_to_end(frame_number)
+                return frame
+        
+        self.request_frame(frame_number)
+        
+        # Results for requests that were superseded are discarded
+        while True:
+            result_number, frame = self._results.get(timeout=self.DECODE_TIMEOUT)
+            if result_number == frame_number:
+                return frame
+    
+    def _serve_request(self, frame_number: int):
+        """Decoder thread: decode a requested frame, then prefetch the following ones"""
+        try:
+            with self._cap_lock:
+                frame = self._read_frame(frame_number) if self.cap else None
+        except Exception as e:
+            print(f"Error decoding frame {frame_number}: {str(e)}")
+            frame = None
+        self._post_result(frame_number, frame)
+        
+        if frame is None:
+            return
+        
+        last = min(frame_number + self.PREFETCH_FRAMES, self.frame_count - 1)
+        for prefetch_number in range(frame_number + 1, last + 1):
+            # A new request (or a stop) takes priority over prefetching
+            if not self._requests.empty():
+                break
+            try:
+                with self._cap_lock:
+                    if not self.cap or self._read_frame(prefetch_number) is None:
+                        break
+            except Exception:
+                break
+    
+    def _post_result(self, frame_number: int, frame: Optional[np.ndarray]):
+        """Queue a decoded frame, dropping the oldest result if nobody collected it"""
+        while True:
+            try:
+                self._results.put_nowait((frame_number, frame))
+                return
+            except queue.Full:
+                try:
+                    self._results.get_nowait()
+                except queue.Empty:
+                    pass
+    
+    def _stop_decoder(self):
+        """Stop the decoder thread and drop pending requests and results"""
+        # Drop stale requests first so the stop sentinel is the next one served
+        _drain(self._requests)
+        
+        self._decoder = None
+        finalizer, self._decoder_finalizer = self._decoder_finalizer, None
+        if finalizer is not None:
+            finalizer()
+        
+        _drain(self._results)
+    
+    def _read_frame(self, frame_number: int) -> Optional[np.ndarray]:
+        """
+        Decode a frame, serving recently decoded frames from an LRU cache
+        
+        Cached frames are shared between callers, so they are returned
+        read-only; copy before drawing on them.
+        
+        Args:
+            frame_number: Frame index
+            
+        Returns:
+            numpy.ndarray: Frame image or None if the read failed
+        """
+        frame = self._frame_cache.get(frame_number)
+        if frame is not None:
+            self._frame_cache.move_to_end(frame_number)
+            return frame
+        
+        # Seek to frame, unless the capture is already positioned on it
+        if frame_number != self._last_pos + 1:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        
+        # Read frame
+        ret, frame = self.cap.read()
+        
+        if not ret:
+            self._last_pos = -2
+            return None
+        
+        self._last_pos = frame_number
+        
+        frame.flags.writeable = False
+        self._frame_cache[frame_number] = frame
+        self._cache_bytes += frame.nbytes
+        while self._cache_bytes > self.MAX_CACHE_BYTES and len(self._frame_cache) > 1:
+            _, evicted = self._frame_cache.popitem(last=False)
+            self._cache_bytes -= evicted.nbytes
+        
+        return frame
+    
+    def _clear_frame_cache(self):
+        """Drop all cached frames"""
+        self._frame_cache.clear()
+        self._cache_bytes = 0
+    
     def timestamp_to_frame(self, timestamp: float) -> int:
         """
         Convert timestamp to frame number
@@ -167,6 +362,36 @@ class VideoProcessor:
             return frame_number / self.fps
         return 0.0
     
+    def timestamps_to_frames(self, timestamps) -> np.ndarray:
+        """
+        Convert many timestamps to frame numbers at once
+        
+        Args:
+            timestamps: Array-like of times in seconds
+            
+        Returns:
+            numpy.ndarray: int64 frame numbers, truncated like timestamp_to_frame
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if self.fps > 0:
+            return (timestamps * self.fps).astype(np.int64)
+        return np.zeros(timestamps.shape, dtype=np.int64)
+    
+    def frames_to_timestamps(self, frame_numbers) -> np.ndarray:
+        """
+        Convert many frame numbers to timestamps at once
+        
+        Args:
+            frame_numbers: Array-like of frame indices
+            
+        Returns:
+            numpy.ndarray: float64 timestamps in seconds
+        """
+        frame_numbers = np.asarray(frame_numbers, dtype=np.float64)
+        if self.fps > 0:
+            return frame_numbers / self.fps
+        return np.zeros(frame_numbers.shape, dtype=np.float64)
+    
     def get_video_info(self) -> dict:
         """
         Get video information dictionary
@@ -199,15 +424,28 @@ class VideoProcessor:
         
         x, y, width, height = bbox
         
-        # Check for negative coordinates or zero area
-        if x < 0 or y < 0 or width <= 0 or height <= 0:
-            return False
+        # Positive area, non-negative origin and inside the frame, combined
+        # without short-circuiting
+        return bool((width > 0) & (height > 0) & (x >= 0) & (y >= 0)
+                    & (x + width <= self.width) & (y + height <= self.height))
+    
+    def validate_bounding_boxes(self, bboxes) -> np.ndarray:
+        """
+        Validate many bounding boxes against frame dimensions at once
         
-        # Check if bounding box is within frame boundaries
-        if x + width > self.width or y + height > self.height:
-            return False
+        Args:
+            bboxes: N x 4 array-like of [x, y, width, height]
+            
+        Returns:
+            numpy.ndarray: Boolean mask, True for each valid box
+        """
+        boxes = np.asarray(bboxes, dtype=np.int32).reshape(-1, 4)
+        if not self.is_loaded:
+            return np.zeros(len(boxes), dtype=bool)
         
-        return True
+        x, y, width, height = boxes.T
+        return ((width > 0) & (height > 0) & (x >= 0) & (y >= 0)
+                & (x + width <= self.width) & (y + height <= self.height))
     
     def extract_frame_sequence(self, start_time: float, end_time: float, 
                              step: float = 1.0) -> list:
@@ -224,16 +462,70 @@ class VideoProcessor:
         """
         frames = []
         
-        if not self.is_loaded:
+        if not self.is_loaded or not self.cap:
             return frames
         
+        # Frame index for every sample time inside the video
+        samples = []
         current_time = start_time
         while current_time <= end_time:
-            frame = self.get_frame_at_time(current_time)
-            if frame is not None:
-                frames.append((current_time, frame))
+            if 0 <= current_time <= self.duration:
+                samples.append((current_time, int(current_time * self.fps)))
             current_time += step
         
+        if not samples:
+            return frames
+        
+        with self._cap_lock:
+            return self._walk_frame_sequence(samples)
+    
+    def _walk_frame_sequence(self, samples: list) -> list:
+        """
+        Decode (timestamp, frame_number) samples in order with one seek
+        
+        Args:
+            samples: Sorted (timestamp, frame_number) pairs
+            
+        Returns:
+            list: List of (timestamp, frame) tuples
+        """
+        frames = []
+        
+        # The walk below moves the capture; only trust its position once done
+        self._last_pos = -2
+        
+        try:
+            # Seek once, then walk forward: grab() skips frames without
+            # converting them and retrieve() decodes only the sampled ones
+            position = samples[0][1]
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+            frame = None
+            
+            for timestamp, frame_number in samples:
+                if frame_number - position > self.MAX_SEQUENTIAL_SKIP:
+                    position = frame_number
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+                
+                while position < frame_number and self.cap.grab():
+                    position += 1
+                
+                # Samples closer than one frame apart reuse the last frame
+                if position == frame_number:
+                    if not self.cap.grab():
+                        break
+                    ret, frame = self.cap.retrieve()
+                    position += 1
+                    if not ret:
+                        frame = None
+                
+                if frame is not None and position == frame_number + 1:
+                    frames.append((timestamp, frame))
+            
+            self._last_pos = position - 1
+                    
+        except Exception as e:
+            print(f"Error extracting frame sequence: {str(e)}")
+        
         return frames
     
     def get_frame_dimensions(self) -> Tuple[int, int]:
@@ -268,9 +560,15 @@ class VideoProcessor:
     
     def cleanup(self):
         """Clean up video capture resources"""
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        self._stop_decoder()
+        
+        with self._cap_lock:
+            if self.cap:
+                self.cap.release()
+                self.cap = None
+        
+        self._clear_frame_cache()
+        self._last_pos = -2
         
         self.video_path = None
         self.fps = 0.0
@@ -285,6 +583,50 @@ class VideoProcessor:
         self.cleanup()
 
 
+def _run_decoder(processor_ref, requests: queue.Queue):
+    """
+    Decoder thread body
+    
+    Args:
+        processor_ref: Weak reference to the owning VideoProcessor
+        requests: Queue of frame numbers, None to stop
+    """
+    while True:
+        frame_number = requests.get()
+        processor = processor_ref()
+        if frame_number is None or processor is None:
+            return
+        processor._serve_request(frame_number)
+        # Do not keep the processor alive while waiting for the next request
+        del processor
+
+
+def _drain(pending: queue.Queue):
+    """Discard everything currently in a queue"""
+    while True:
+        try:
+            pending.get_nowait()
+        except queue.Empty:
+            return
+
+
+def _stop_decoder_thread(requests: queue.Queue, decoder: threading.Thread,
+                         timeout: float):
+    """
+    Ask a decoder thread to stop and wait for it
+    
+    Args:
+        requests: The thread's request queue
+        decoder: Decoder thread
+        timeout: Seconds to wait for the current decode to finish
+    """
+    if decoder.is_alive():
+        requests.put(None)
+        # The last reference to a processor can be dropped on its own thread
+        if decoder is not threading.current_thread():
+            decoder.join(timeout=timeout)
+
+
 def validate_video_file_path(file_path: str) -> bool:
     """
     Validate video file path and extension
@@ -295,12 +637,30 @@ def validate_video_file_path(file_path: str) -> bool:
     Returns:
         bool: True if valid video file, False otherwise
     """
-    if not os.path.exists(file_path):
+    # Extension first: rejecting it needs no syscall
+    if not _has_video_extension(file_path):
         return False
     
-    valid_extensions = ['.mp4', '.mov', '.avi', '.mkv', '.wmv']
-    file_ext = os.path.splitext(file_path)[1].lower()
-    return file_ext in valid_extensions
+    try:
+        os.stat(file_path)
+    except OSError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=1024)
+def _has_video_extension(file_path: str) -> bool:
+    """Check whether a path has a supported video file extension"""
+    return _video_extension(file_path) in VALID_VIDEO_EXTENSIONS
+
+
+def _video_extension(file_path: str) -> str:
+    """Lowercase extension of the file name in a path, including the dot"""
+    dot = file_path.rfind('.')
+    # A dot leading the file name marks a hidden file, not an extension
+    if dot <= max(file_path.rfind('/'), file_path.rfind(os.sep)) + 1:
+        return ''
+    return file_path[dot:].lower()
 
 
 def get_video_duration(video_path: str) -> float: